@@ -2,6 +2,10 @@
 
 # Hostinger VPS Deployment Script for Abba's Whispers
 # Run this script on your VPS after connecting via SSH
+#
+# SERVER_PROFILE=asgi runs the API under uvicorn workers with the async
+# read endpoints enabled; the default (wsgi) keeps the classic setup.
+SERVER_PROFILE=${SERVER_PROFILE:-wsgi}
 
 echo "🚀 Starting Abba's Whispers deployment on Hostinger VPS..."
 
@@ -30,6 +34,7 @@ source venv/bin/activate
 cd django_backend
 pip install -r requirements.txt
 pip install gunicorn
+pip install uvicorn
 
 # Setup PostgreSQL database
 sudo -u postgres psql << EOF
@@ -58,8 +63,24 @@ EMAIL_HOST_USER=your-email@gmail.com
 EMAIL_HOST_PASSWORD=your-app-password
 CONTACT_EMAIL=info@abbawhispers.com
 PRAYER_TEAM_EMAIL=prayer@abbawhispers.com
+AUDIO_X_ACCEL_REDIRECT_PREFIX=/protected-media/
+EVENT_BROKER_DIR=/var/www/abbaswhispers/events
+CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+CACHE_LOCATION=/var/www/abbaswhispers/cache
+SNAPSHOT_ROOT=/var/www/abbaswhispers/snapshots
+SNAPSHOT_BASE_URL=https://abbaswhispers.com
 EOF
 
+if [ "$SERVER_PROFILE" = "asgi" ]; then
+    echo "ASYNC_API=True" >> .env
+    APP_SERVER="--worker-class uvicorn.workers.UvicornWorker abba_whispers.asgi:application"
+else
+    APP_SERVER="abba_whispers.wsgi:application"
+fi
+
+# Response cache shared by all gunicorn workers (see CACHES in settings.py)
+mkdir -p /var/www/abbaswhispers/cache
+
 # Run Django migrations
 python manage.py migrate
 python manage.py collectstatic --noinput
@@ -72,6 +93,13 @@ cd ../frontend
 npm install
 npm run build
 
+# Prerender published posts and volumes for nginx; publishing keeps them fresh,
+# the cron job picks up counters (views, downloads) that change without a save
+cd ../django_backend
+python manage.py export_snapshots
+(crontab -l 2>/dev/null | grep -v export_snapshots; echo "*/15 * * * * cd /var/www/abbaswhispers/django_backend && ../venv/bin/python manage.py export_snapshots > /dev/null") | crontab -
+cd ../frontend
+
 # Create Gunicorn service file
 sudo tee /etc/systemd/system/abbaswhispers.service > /dev/null << EOF
 [Unit]
@@ -83,7 +111,26 @@ User=$USER
 Group=www-data
 WorkingDirectory=/var/www/abbaswhispers/django_backend
 Environment="PATH=/var/www/abbaswhispers/venv/bin"
-ExecStart=/var/www/abbaswhispers/venv/bin/gunicorn --workers 3 --bind unix:/var/www/abbaswhispers/abbaswhispers.sock abba_whispers.wsgi:application
+ExecStart=/var/www/abbaswhispers/venv/bin/gunicorn --workers 3 --bind unix:/var/www/abbaswhispers/abbaswhispers.sock $APP_SERVER
+Restart=always
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
+# Create the event stream (SSE) service; ASGI so idle listeners don't hold worker threads
+mkdir -p /var/www/abbaswhispers/events
+sudo tee /etc/systemd/system/abbaswhispers-events.service > /dev/null << EOF
+[Unit]
+Description=Abba's Whispers event stream
+After=network.target
+
+[Service]
+User=$USER
+Group=www-data
+WorkingDirectory=/var/www/abbaswhispers/django_backend
+Environment="PATH=/var/www/abbaswhispers/venv/bin"
+ExecStart=/var/www/abbaswhispers/venv/bin/uvicorn --uds /var/www/abbaswhispers/abbaswhispers-events.sock --workers 2 --lifespan off abba_whispers.asgi:application
 Restart=always
 
 [Install]
@@ -92,6 +139,19 @@ EOF
 
 # Create Nginx configuration
 sudo tee /etc/nginx/sites-available/abbaswhispers << EOF
+# Anonymous GETs of published content are answered from export_snapshots output
+map \$args \$snapshot_page {
+    ""                  index;
+    "~^page=([0-9]+)\$"  page-\$1;
+    default             "";
+}
+
+map "\$request_method:\$http_authorization" \$snapshot_allowed {
+    "GET:"   1;
+    "HEAD:"  1;
+    default  0;
+}
+
 server {
     listen 80;
     server_name abbaswhispers.com www.abbaswhispers.com 46.202.141.138;
@@ -110,11 +170,51 @@ server {
         add_header Cache-Control "public, immutable";
     }
 
+    # Only reachable through X-Accel-Redirect from the audio stream view
+    location /protected-media/ {
+        internal;
+        alias /var/www/abbaswhispers/django_backend/media/;
+    }
+
+    location = /api/events/ {
+        include proxy_params;
+        proxy_pass http://unix:/var/www/abbaswhispers/abbaswhispers-events.sock;
+        proxy_http_version 1.1;
+        proxy_set_header Connection '';
+        proxy_buffering off;
+        proxy_read_timeout 1h;
+    }
+
+    location ~ ^/api/(blog|volumes)/([0-9]+/)?\$ {
+        error_page 418 = @api;
+        if (\$snapshot_allowed = 0) { return 418; }
+        root /var/www/abbaswhispers/snapshots;
+        default_type application/json;
+        add_header Cache-Control "no-cache";
+        add_header Vary "Accept";
+        try_files \$uri\$snapshot_page.json @api;
+    }
+
     location /api/ {
         include proxy_params;
         proxy_pass http://unix:/var/www/abbaswhispers/abbaswhispers.sock;
     }
 
+    location @api {
+        include proxy_params;
+        proxy_pass http://unix:/var/www/abbaswhispers/abbaswhispers.sock;
+    }
+
+    location ~ ^/(?<snapshot_path>(blog|volumes)(/[0-9]+)?)/?\$ {
+        root /var/www/abbaswhispers/snapshots;
+        try_files /\$snapshot_path/index.html @frontend;
+    }
+
+    location @frontend {
+        root /var/www/abbaswhispers/frontend/dist;
+        try_files /index.html =404;
+    }
+
     location /admin/ {
         include proxy_params;
         proxy_pass http://unix:/var/www/abbaswhispers/abbaswhispers.sock;
@@ -140,6 +240,8 @@ sudo nginx -t
 sudo systemctl daemon-reload
 sudo systemctl start abbaswhispers
 sudo systemctl enable abbaswhispers
+sudo systemctl start abbaswhispers-events
+sudo systemctl enable abbaswhispers-events
 sudo systemctl restart nginx
 sudo systemctl enable nginx
 
@@ -2,4 +2,15 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'abba_whispers.settings')
-application = get_asgi_application()
\ No newline at end of file
+django_application = get_asgi_application()
+
+from api.events import sse_application  # noqa: E402  (needs settings configured)
+
+EVENT_STREAM_PATH = '/api/events/'
+
+
+async def application(scope, receive, send):
+    # Long-lived event streams bypass Django; everything else goes through it
+    if scope['type'] == 'http' and scope['path'] == EVENT_STREAM_PATH:
+        return await sse_application(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -87,9 +87,20 @@ STATICFILES_DIRS = [
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# When set (e.g. '/protected-media/'), audio streams are handed to nginx via X-Accel-Redirect
+AUDIO_X_ACCEL_REDIRECT_PREFIX = config('AUDIO_X_ACCEL_REDIRECT_PREFIX', default='')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Widths (px) of the resized copies generated for uploaded images
+IMAGE_DERIVATIVE_WIDTHS = [320, 640, 1024, 1600]
+BACKGROUND_TASK_WORKERS = config('BACKGROUND_TASK_WORKERS', default=2, cast=int)
+
+# Uploaded volume audio: MP3 renditions (kbps) when ffmpeg is installed, and waveform resolution
+FFMPEG_BINARY = config('FFMPEG_BINARY', default='ffmpeg')
+AUDIO_RENDITION_BITRATES = {'low': 64, 'high': 192}
+AUDIO_WAVEFORM_PEAKS = 800
+
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -101,10 +112,59 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.HybridPagination',
     'PAGE_SIZE': 20,
 }
 
+# Cache Configuration
+# API responses are invalidated by bumping per-model versions in this cache, so
+# every worker process must share it: LocMemCache is only for a single process
+# (runserver); deployments use FileBasedCache or another shared backend.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='abba-whispers'),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=10000, cast=int),
+        },
+    }
+}
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = config('API_CACHE_TIMEOUT', default=300, cast=int)
+
+# Seconds between write-behind flushes of buffered counters (downloads, views)
+COUNTER_FLUSH_INTERVAL = config('COUNTER_FLUSH_INTERVAL', default=10, cast=int)
+# A post view or audio play from the same client is counted once per window (seconds)
+VIEW_DEDUPE_WINDOW = config('VIEW_DEDUPE_WINDOW', default=1800, cast=int)
+VIEW_DEDUPE_CAPACITY = config('VIEW_DEDUPE_CAPACITY', default=100000, cast=int)
+# Approved comments embedded per post with ?include=comments_preview
+COMMENT_PREVIEW_SIZE = 3
+# Size of the in-memory featured books set served by /api/books/featured/
+FEATURED_BOOKS_LIMIT = 12
+
+# Server-sent content-change events (/api/events/, served by asgi.py).
+# Set EVENT_BROKER_DIR to relay events between worker processes on one host.
+EVENT_BROKER_DIR = config('EVENT_BROKER_DIR', default='')
+EVENT_STREAM_QUEUE_SIZE = 32
+EVENT_STREAM_MAX_CLIENTS = config('EVENT_STREAM_MAX_CLIENTS', default=10000, cast=int)
+
+# Static snapshots of published posts and volumes for nginx (export_snapshots).
+# When SNAPSHOT_ROOT is set, publishing or editing content refreshes them in the background.
+SNAPSHOT_ROOT = config('SNAPSHOT_ROOT', default='')
+# Scheme and host used for absolute URLs inside the snapshots
+SNAPSHOT_BASE_URL = config('SNAPSHOT_BASE_URL', default='http://localhost:8000')
+
+# Serve the hot read endpoints from api/async_views.py (only useful under ASGI)
+ASYNC_API = config('ASYNC_API', default=False, cast=bool)
+
+# Anonymous form pre-filter (comments, prayer requests, contact messages).
+# Buckets are (burst, submissions per minute), per process.
+SPAM_IP_BUCKET = (20, 10)
+SPAM_FINGERPRINT_BUCKET = (5, 2)
+SPAM_SCORE_THRESHOLD = config('SPAM_SCORE_THRESHOLD', default=6, cast=int)
+SPAM_DUPLICATE_WINDOW = 3600
+SPAM_DUPLICATE_CAPACITY = 50000
+
 # JWT Configuration
 from datetime import timedelta
 SIMPLE_JWT = {
@@ -136,6 +196,16 @@ EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='Abba\'s Whispers <info@abbawhispers.com>')
+
+# Notification outbox (drained by `manage.py send_outbox`)
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETRY_BASE_SECONDS = 60
+OUTBOX_RETRY_MAX_SECONDS = 6 * 60 * 60
+
+# Newsletter delivery (`manage.py send_newsletter`)
+NEWSLETTER_BATCH_SIZE = config('NEWSLETTER_BATCH_SIZE', default=100, cast=int)
+NEWSLETTER_SEND_RATE = config('NEWSLETTER_SEND_RATE', default=10, cast=float)  # messages per second, 0 = unthrottled
 
 # Custom Settings
 CONTACT_EMAIL = config('CONTACT_EMAIL', default='info@abbawhispers.com')
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import BlogPost, Volume, PrayerRequest, ContactMessage, Subscriber, Comment, SiteSetting, Testimonial, PrayerTestimonial
+from .models import BlogPost, Volume, PrayerRequest, ContactMessage, Subscriber, Comment, SiteSetting, Testimonial, PrayerTestimonial, Tag, OutboxMessage, NewsletterCampaign, Book
 
 @admin.register(BlogPost)
 class BlogPostAdmin(admin.ModelAdmin):
@@ -15,6 +15,12 @@ class BlogPostAdmin(admin.ModelAdmin):
             obj.author = request.user
         super().save_model(request, obj, form, change)
 
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'slug', 'post_count']
+    search_fields = ['name']
+    readonly_fields = ['post_count']
+
 @admin.register(Volume)
 class VolumeAdmin(admin.ModelAdmin):
     list_display = ['title', 'category', 'price', 'status', 'created_at']
@@ -75,7 +81,32 @@ class PrayerTestimonialAdmin(admin.ModelAdmin):
     list_editable = ['status', 'order']
     ordering = ['order', '-created_at']
 
+@admin.register(Book)
+class BookAdmin(admin.ModelAdmin):
+    list_display = ['title', 'category', 'price', 'status', 'featured', 'sales_count', 'created_at']
+    list_filter = ['status', 'category', 'featured', 'created_at']
+    search_fields = ['title', 'subtitle', 'author', 'isbn']
+    list_editable = ['status', 'featured']
+    readonly_fields = ['sales_count']
+
 @admin.register(SiteSetting)
 class SiteSettingAdmin(admin.ModelAdmin):
     list_display = ['setting_key', 'setting_value', 'updated_at']
-    search_fields = ['setting_key']
\ No newline at end of file
+    search_fields = ['setting_key']
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject']
+    readonly_fields = ['created_at', 'sent_at', 'last_error']
+
+@admin.register(NewsletterCampaign)
+class NewsletterCampaignAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'sent_count', 'failed_count', 'bounced_count', 'created_at', 'completed_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject']
+    readonly_fields = [
+        'status', 'last_subscriber_id', 'sent_count', 'failed_count', 'bounced_count',
+        'started_at', 'completed_at',
+    ]
@@ -0,0 +1,200 @@
+"""
+Async read endpoints for ASGI deployments (enabled with ASYNC_API).
+
+They answer the common cases with the async ORM and cache API:
+conditional 304s, cache hits, page-number list pages and detail lookups,
+all rendered as JSON. Anything else is handed to the regular DRF view in
+a thread: writes, cursor pagination, `?include=`, other renderers,
+authenticated requests and errors. Responses and permissions therefore
+match the sync path exactly.
+"""
+import math
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from rest_framework.exceptions import APIException
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .cache import acached_data
+from .conditional import detail_etag, list_etag, set_validators
+from .models import Comment
+from .serializers import CommentSerializer
+from . import views
+
+LIST_ACTIONS = {'get': 'list', 'post': 'create'}
+DETAIL_ACTIONS = {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}
+
+
+def csrf_exempt(view):
+    # Django 4.2's decorator wraps coroutines in a sync function; mark them instead, as DRF views are
+    view.csrf_exempt = True
+    return view
+
+
+class Fallback(Exception):
+    """The request needs the full DRF view."""
+
+
+def negotiates_json(request):
+    """True when DRF would render this read request with the JSON renderer."""
+    if request.method not in ('GET', 'HEAD') or 'HTTP_AUTHORIZATION' in request.META:
+        return False
+    if api_settings.URL_FORMAT_OVERRIDE in request.GET:
+        return False
+    renderers = [renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES]
+    try:
+        renderer, _ = DefaultContentNegotiation().select_renderer(Request(request), renderers)
+    except APIException:
+        return False
+    return isinstance(renderer, JSONRenderer)
+
+
+def json_response(data, allow):
+    response = HttpResponse(JSONRenderer().render(data), content_type='application/json')
+    response['Allow'] = allow
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def prepare_view(viewset_class, request, action, kwargs):
+    """Set up a viewset instance the way DRF's dispatch would, without running it."""
+    if not negotiates_json(request):
+        raise Fallback
+    view = viewset_class()
+    actions = LIST_ACTIONS if action == 'list' else DETAIL_ACTIONS
+    view.action_map = {**actions, 'head': actions['get']}
+    for method, name in view.action_map.items():
+        setattr(view, method, getattr(view, name))
+    view.action = action
+    view.args, view.kwargs = (), kwargs
+    view.format_kwarg = None
+    view.headers = {}
+    view.request = drf_request = view.initialize_request(request)
+    drf_request.accepted_renderer, drf_request.accepted_media_type = view.perform_content_negotiation(drf_request)
+    if drf_request.query_params.get('include') or view.paginator.use_keyset(drf_request):
+        raise Fallback
+    return view
+
+
+async def list_response(view, request):
+    try:
+        queryset = view.filter_queryset(view.get_queryset())
+    except APIException:
+        raise Fallback
+    field = view.conditional_timestamp_field
+    fingerprint = await queryset.order_by().aaggregate(count=Count('pk'), last_modified=Max(field))
+    count, last_modified = fingerprint['count'], fingerprint['last_modified']
+    etag = list_etag(queryset.model, count, last_modified, request.get_full_path(), 'json')
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if not_modified is not None:
+        return set_validators(not_modified, etag, last_modified)
+
+    page_size = view.paginator.get_page_size(view.request)
+    num_pages = max(1, math.ceil(count / page_size))
+    page_param = view.paginator.page_query_param
+    page = request.GET.get(page_param, 1)
+    page = num_pages if page in view.paginator.last_page_strings else page
+    try:
+        page = int(page)
+    except (TypeError, ValueError):
+        raise Fallback
+    if not 1 <= page <= num_pages:
+        raise Fallback
+
+    async def compute():
+        offset = (page - 1) * page_size
+        rows = [row async for row in queryset[offset:offset + page_size]]
+        url = request.build_absolute_uri()
+        previous = None
+        if page > 1:
+            previous = (
+                remove_query_param(url, page_param) if page == 2 else replace_query_param(url, page_param, page - 1)
+            )
+        return {
+            'count': count,
+            'next': replace_query_param(url, page_param, page + 1) if page < num_pages else None,
+            'previous': previous,
+            'results': view.get_serializer(rows, many=True).data,
+        }
+
+    data, stale = await acached_data(request, 'json', view.get_cache_dependencies(), compute, salt=etag)
+    response = json_response(data, ', '.join(view.allowed_methods))
+    response.stale = stale
+    return set_validators(response, etag, last_modified)
+
+
+async def detail_response(view, request, pk):
+    queryset = view.filter_queryset(view.get_queryset()).filter(pk=pk)
+    last_modified = await queryset.values_list(view.conditional_timestamp_field, flat=True).afirst()
+    if last_modified is None:
+        raise Fallback  # 404s come from DRF
+    etag = detail_etag(queryset.model, pk, last_modified, request.get_full_path(), 'json')
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(last_modified.timestamp()))
+    if not_modified is not None:
+        return set_validators(not_modified, etag, last_modified)
+
+    async def compute():
+        instance = await queryset.afirst()
+        if instance is None:
+            raise Fallback
+        return view.get_serializer(instance).data
+
+    data, stale = await acached_data(request, 'json', view.get_cache_dependencies(), compute, salt=etag)
+    response = json_response(data, ', '.join(view.allowed_methods))
+    response.stale = stale
+    return set_validators(response, etag, last_modified)
+
+
+def async_viewset(viewset_class):
+    """Async list and detail views for a read-optimised public viewset."""
+    sync_list = sync_to_async(viewset_class.as_view(LIST_ACTIONS))
+    sync_detail = sync_to_async(viewset_class.as_view(DETAIL_ACTIONS))
+
+    @csrf_exempt
+    async def list_view(request):
+        try:
+            return await list_response(prepare_view(viewset_class, request, 'list', {}), request)
+        except Fallback:
+            return await sync_list(request)
+
+    @csrf_exempt
+    async def detail_view(request, pk):
+        try:
+            return await detail_response(prepare_view(viewset_class, request, 'retrieve', {'pk': pk}), request, pk)
+        except Fallback:
+            return await sync_detail(request, pk=pk)
+
+    return list_view, detail_view
+
+
+blog_list, blog_detail = async_viewset(views.BlogPostViewSet)
+volume_list, volume_detail = async_viewset(views.VolumeViewSet)
+testimonial_list, testimonial_detail = async_viewset(views.TestimonialViewSet)
+
+
+@csrf_exempt
+async def health_check(request):
+    if not negotiates_json(request):
+        return await sync_to_async(views.health_check)(request)
+    return json_response({'status': 'OK', 'message': 'Django API is running'}, 'GET, OPTIONS')
+
+
+@csrf_exempt
+async def get_post_comments(request, pk):
+    if not negotiates_json(request):
+        return await sync_to_async(views.get_post_comments)(request, pk=pk)
+
+    async def compute():
+        comments = [comment async for comment in Comment.objects.filter(post_id=pk, status='approved')]
+        return CommentSerializer(comments, many=True).data
+
+    data, _ = await acached_data(request, 'json', [Comment], compute)
+    return json_response(data, 'GET, OPTIONS')
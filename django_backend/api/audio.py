@@ -0,0 +1,164 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import wave
+
+import numpy as np
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import invalidate
+
+PEAK_SAMPLE_RATE = 8000
+
+# MPEG-1 Layer III bitrates (kbps) and sample rates, indexed by header bits
+MP3_BITRATES = [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0]
+MP3_SAMPLE_RATES = [44100, 48000, 32000, 0]
+
+
+def ffmpeg_binary():
+    return shutil.which(settings.FFMPEG_BINARY)
+
+
+def decode_pcm(path):
+    """Decode to mono float32 samples at PEAK_SAMPLE_RATE, or None if we can't."""
+    ffmpeg = ffmpeg_binary()
+    if ffmpeg:
+        try:
+            result = subprocess.run(
+                [ffmpeg, '-v', 'error', '-i', path, '-ac', '1', '-ar', str(PEAK_SAMPLE_RATE), '-f', 's16le', '-'],
+                capture_output=True, check=True,
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return np.frombuffer(result.stdout, dtype='<i2').astype(np.float32) / 32768, PEAK_SAMPLE_RATE
+
+    try:
+        with wave.open(path, 'rb') as wav:
+            channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None
+    if width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768
+    elif width == 4:
+        samples = np.frombuffer(frames, dtype='<i4').astype(np.float32) / 2 ** 31
+    else:
+        return None
+    return samples.reshape(-1, channels).mean(axis=1), rate
+
+
+def compute_peaks(samples, count):
+    """Downsample to `count` absolute peaks in [0, 1] without a Python-level loop."""
+    if samples.size == 0:
+        return []
+    starts = np.linspace(0, samples.size, count, endpoint=False).astype(np.intp)
+    peaks = np.maximum.reduceat(np.abs(samples).astype(np.float64), starts)
+    loudest = peaks.max()
+    if loudest > 0:
+        peaks /= loudest
+    return np.round(peaks, 3).tolist()
+
+
+def estimate_mp3_duration(path):
+    """Duration of a constant-bitrate MP3 from its first frame header."""
+    with open(path, 'rb') as f:
+        head = f.read(10)
+        offset = 0
+        if head[:3] == b'ID3':
+            offset = 10 + ((head[6] & 0x7f) << 21 | (head[7] & 0x7f) << 14 | (head[8] & 0x7f) << 7 | (head[9] & 0x7f))
+        f.seek(offset)
+        data = f.read(64 * 1024)
+    for i in range(len(data) - 4):
+        if data[i] == 0xFF and data[i + 1] & 0xFE == 0xFA:  # MPEG-1 Layer III sync
+            bitrate = MP3_BITRATES[data[i + 2] >> 4]
+            if bitrate and MP3_SAMPLE_RATES[(data[i + 2] >> 2) & 3]:
+                return (os.path.getsize(path) - offset - i) * 8 / (bitrate * 1000)
+    return None
+
+
+def transcode(source, bitrate):
+    """Loudness-normalised MP3 rendition of `source` in a temporary file."""
+    output = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
+    output.close()
+    subprocess.run(
+        [
+            ffmpeg_binary(), '-y', '-v', 'error', '-i', source, '-vn',
+            '-af', 'loudnorm=I=-16:TP=-1.5:LRA=11',
+            '-codec:a', 'libmp3lame', '-b:a', f'{bitrate}k', output.name,
+        ],
+        check=True,
+    )
+    return output.name
+
+
+def rendition_name(name, label, bitrate):
+    directory, filename = os.path.split(name)
+    root, _ = os.path.splitext(filename)
+    return os.path.join(directory, 'renditions', f'{root}_{label}_{bitrate}k.mp3')
+
+
+def build_renditions(field_file, path):
+    if not ffmpeg_binary():
+        return {}
+    renditions = {}
+    storage = field_file.storage
+    for label, bitrate in settings.AUDIO_RENDITION_BITRATES.items():
+        temp_path = transcode(path, bitrate)
+        try:
+            name = rendition_name(field_file.name, label, bitrate)
+            if storage.exists(name):
+                storage.delete(name)
+            with open(temp_path, 'rb') as f:
+                name = storage.save(name, File(f))
+            renditions[label] = {'name': name, 'bitrate': bitrate, 'size': os.path.getsize(temp_path)}
+        finally:
+            os.unlink(temp_path)
+    return renditions
+
+
+def process_audio(model, pk):
+    """
+    Compute duration, size, waveform peaks and renditions for a volume's
+    audio. Uses ffmpeg when installed; otherwise WAV files are decoded in
+    Python and MP3 durations are estimated, with no renditions.
+    """
+    volume = model.objects.filter(pk=pk).only('audio_file', 'audio_renditions').first()
+    if volume is None:
+        return
+    field_file = volume.audio_file
+    storage = field_file.storage
+    metadata = {'audio_duration': None, 'audio_size': None, 'waveform_peaks': [], 'audio_renditions': {}}
+
+    if field_file:
+        path = storage.path(field_file.name)
+        metadata['audio_size'] = os.path.getsize(path)
+        decoded = decode_pcm(path)
+        if decoded is not None:
+            samples, rate = decoded
+            metadata['audio_duration'] = round(samples.size / rate, 2)
+            metadata['waveform_peaks'] = compute_peaks(samples, settings.AUDIO_WAVEFORM_PEAKS)
+        elif field_file.name.lower().endswith('.mp3'):
+            duration = estimate_mp3_duration(path)
+            metadata['audio_duration'] = round(duration, 2) if duration else None
+        metadata['audio_renditions'] = build_renditions(field_file, path)
+
+    kept = {rendition['name'] for rendition in metadata['audio_renditions'].values()}
+    for rendition in (volume.audio_renditions or {}).values():
+        if rendition['name'] not in kept and storage.exists(rendition['name']):
+            storage.delete(rendition['name'])
+
+    # Skip the write if the file was replaced while we were working
+    if field_file:
+        unchanged = Q(audio_file=field_file.name)
+    else:
+        unchanged = Q(audio_file='') | Q(audio_file__isnull=True)
+    model.objects.filter(unchanged, pk=pk).update(
+        **metadata, updated_at=timezone.now()
+    )
+    invalidate(model)
@@ -0,0 +1,30 @@
+import threading
+
+from django.conf import settings
+
+from .cache import get_versions
+from .models import Book
+
+
+class FeaturedBooks:
+    """
+    The featured books, held in process memory and rebuilt only when the
+    Book cache version changes, so serving them costs no query. The version
+    is bumped by the Book save/delete signals in the shared API cache, so an
+    edit made in one worker is seen by all.
+    """
+    _lock = threading.Lock()
+    _books = None
+    _version = None
+
+    @classmethod
+    def get(cls):
+        version = get_versions([Book])[0]
+        with cls._lock:
+            if cls._books is None or cls._version != version:
+                cls._books = list(
+                    Book.objects.filter(status='published', featured=True)
+                    .order_by('-created_at', '-id')[:settings.FEATURED_BOOKS_LIMIT]
+                )
+                cls._version = version
+            return cls._books, version
@@ -0,0 +1,185 @@
+import asyncio
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+LOCK_TIMEOUT = 10
+LOCK_POLL_INTERVAL = 0.05
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def version_key(model):
+    return f'api:version:{model._meta.label_lower}'
+
+
+def get_versions(models):
+    """
+    Return the current cache version of each model, initialising missing ones.
+
+    Versions start from a timestamp rather than 1 so that a version key which
+    was evicted can never be recreated with a value an older entry used.
+    """
+    cache = get_cache()
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+async def aget_versions(models):
+    """Async counterpart of get_versions() for ASGI views."""
+    cache = get_cache()
+    keys = [version_key(model) for model in models]
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, time.time_ns(), timeout=None)
+            versions[key] = await cache.aget(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate(*models):
+    cache = get_cache()
+    for model in models:
+        key = version_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def cache_keys(full_path, renderer_format, versions, salt=''):
+    """Return (stale_key, key); the stale key survives invalidation, the key does not."""
+    fingerprint = hashlib.md5(f'{full_path}:{renderer_format}'.encode()).hexdigest()
+    base = f'api:response:{fingerprint}'
+    return base, f'{base}:{salt}:{".".join(str(version) for version in versions)}'
+
+
+def response_cache_key(request, dependencies, salt=''):
+    return cache_keys(
+        request.get_full_path(), request.accepted_renderer.format, get_versions(dependencies), salt,
+    )
+
+
+def stale_response(data):
+    """
+    A response carrying a payload from before the last invalidation.
+    set_validators() leaves ETag and Last-Modified off it, so a client can
+    never revalidate the old body against the new validators.
+    """
+    response = Response(data)
+    response.stale = True
+    return response
+
+
+def cached_response(request, dependencies, handler, salt=''):
+    """
+    Serve `handler()`'s payload from the cache, keyed by URL, query string,
+    renderer and the current version of every model in `dependencies`.
+
+    Only one caller recomputes a missing entry; concurrent callers get the
+    previous (stale) payload if there is one, or wait for the recomputation.
+    """
+    if request.method != 'GET' or not settings.API_CACHE_TIMEOUT:
+        return handler()
+
+    cache = get_cache()
+    stale_key, key = response_cache_key(request, dependencies, salt)
+    data = cache.get(key)
+    if data is not None:
+        return Response(data)
+
+    lock_key = f'{key}:lock'
+    locked = cache.add(lock_key, 1, LOCK_TIMEOUT)
+    if not locked:
+        data = cache.get(stale_key)
+        if data is not None:
+            return stale_response(data)
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while data is None and time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+    try:
+        response = handler()
+        if response.status_code == 200:
+            cache.set_many({key: response.data, stale_key: response.data}, settings.API_CACHE_TIMEOUT)
+        return response
+    finally:
+        if locked:
+            cache.delete(lock_key)
+
+
+async def acached_data(request, renderer_format, dependencies, compute, salt=''):
+    """
+    Async counterpart of cached_response() for ASGI views: returns
+    (payload, stale) for `request`, awaiting `compute()` on a miss. It
+    shares cache entries with the sync path, so either can fill them for
+    the other.
+    """
+    if not settings.API_CACHE_TIMEOUT:
+        return await compute(), False
+
+    cache = get_cache()
+    versions = await aget_versions(dependencies)
+    stale_key, key = cache_keys(request.get_full_path(), renderer_format, versions, salt)
+    data = await cache.aget(key)
+    if data is not None:
+        return data, False
+
+    lock_key = f'{key}:lock'
+    locked = await cache.aadd(lock_key, 1, LOCK_TIMEOUT)
+    if not locked:
+        data = await cache.aget(stale_key)
+        if data is not None:
+            return data, True
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while data is None and time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            data = await cache.aget(key)
+        if data is not None:
+            return data, False
+
+    try:
+        data = await compute()
+        await cache.aset_many({key: data, stale_key: data}, settings.API_CACHE_TIMEOUT)
+        return data, False
+    finally:
+        if locked:
+            await cache.adelete(lock_key)
+
+
+class CachedResponseMixin:
+    """
+    Caches list and retrieve payloads until one of `cache_dependencies`
+    (the viewset's model by default) is saved or deleted.
+    """
+    cache_dependencies = None
+
+    def get_cache_dependencies(self):
+        return self.cache_dependencies or (self.queryset.model,)
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(
+            request, self.get_cache_dependencies(),
+            lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs),
+            salt=getattr(self, 'response_etag', ''),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(
+            request, self.get_cache_dependencies(),
+            lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs),
+            salt=getattr(self, 'response_etag', ''),
+        )
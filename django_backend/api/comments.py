@@ -0,0 +1,42 @@
+from django.db.models import Count, F, OuterRef, Subquery, Window
+from django.db.models.functions import Coalesce, RowNumber
+from django.utils import timezone
+
+from .cache import invalidate
+from .models import BlogPost, Comment
+
+PREVIEW_FIELDS = ('id', 'post_id', 'author_name', 'content', 'created_at')
+
+
+def refresh_comment_counts(post_ids):
+    """
+    Recount approved comments for the given posts with one UPDATE; `post_ids`
+    may be a list or a queryset of ids. `updated_at` is bumped as well so the
+    posts' ETags and cached responses pick up the new count.
+    """
+    approved = Comment.objects.filter(
+        post=OuterRef('pk'), status='approved',
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+    updated = BlogPost.objects.filter(pk__in=post_ids).update(
+        approved_comment_count=Coalesce(Subquery(approved), 0),
+        updated_at=timezone.now(),
+    )
+    if updated:
+        invalidate(BlogPost)
+
+
+def comment_previews(post_ids, size):
+    """Latest `size` approved comments per post, as {post_id: [row, ...]}, in one query."""
+    rows = (
+        Comment.objects.filter(post_id__in=post_ids, status='approved')
+        .annotate(position=Window(
+            RowNumber(), partition_by=F('post_id'), order_by=[F('created_at').desc(), F('id').desc()],
+        ))
+        .filter(position__lte=size)
+        .order_by('post_id', 'position')
+        .values(*PREVIEW_FIELDS)
+    )
+    previews = {}
+    for row in rows:
+        previews.setdefault(row.pop('post_id'), []).append(row)
+    return previews
@@ -0,0 +1,108 @@
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def queryset_fingerprint(queryset, timestamp_field='updated_at'):
+    """Return (count, last_modified) for a queryset in a single aggregate query."""
+    result = queryset.order_by().aggregate(
+        count=Count('pk'),
+        last_modified=Max(timestamp_field),
+    )
+    return result['count'], result['last_modified']
+
+
+def make_etag(*parts):
+    digest = hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+    return quote_etag(digest)
+
+
+def list_etag(model, count, last_modified, full_path, renderer_format):
+    return make_etag(model._meta.label, count, last_modified, full_path, renderer_format)
+
+
+def detail_etag(model, pk, last_modified, full_path, renderer_format):
+    return make_etag(model._meta.label, pk, last_modified, full_path, renderer_format)
+
+
+def set_validators(response, etag, last_modified):
+    # A stale cached payload was built under older validators; sending the
+    # current ones with it would let clients revalidate the old body forever
+    if getattr(response, 'stale', False):
+        patch_cache_control(response, no_cache=True)
+        return response
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Always revalidate so clients never serve a heuristically cached list
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+class ConditionalResponseMixin:
+    """
+    Answers If-None-Match / If-Modified-Since on list and retrieve with a 304
+    before the queryset is evaluated or serialized.
+
+    The validators are derived from the row count and the newest
+    `conditional_timestamp_field` of the filtered queryset, so any insert,
+    update or delete that changes the visible collection changes the ETag.
+    """
+    conditional_timestamp_field = 'updated_at'
+
+    def get_list_validators(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        count, last_modified = queryset_fingerprint(queryset, self.conditional_timestamp_field)
+        etag = list_etag(
+            queryset.model, count, last_modified, request.get_full_path(), request.accepted_renderer.format,
+        )
+        return etag, last_modified
+
+    def get_detail_validators(self, request):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+            last_modified = queryset.values_list(self.conditional_timestamp_field, flat=True).first()
+        except (TypeError, ValueError, ValidationError):
+            return None, None
+        if last_modified is None:
+            return None, None
+        etag = detail_etag(
+            queryset.model, self.kwargs[lookup_url_kwarg], last_modified,
+            request.get_full_path(), request.accepted_renderer.format,
+        )
+        return etag, last_modified
+
+    def conditional_response(self, request, get_validators, handler, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = get_validators(request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        not_modified = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=int(last_modified.timestamp()) if last_modified else None,
+        )
+        if not_modified is not None:
+            return set_validators(not_modified, etag, last_modified)
+
+        # Lets CachedResponseMixin key its entries on the same fingerprint
+        self.response_etag = etag
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_validators(response, etag, last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, self.get_list_validators, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, self.get_detail_validators, super().retrieve, *args, **kwargs)
@@ -0,0 +1,73 @@
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+
+class CounterBuffer:
+    """
+    Buffers integer increments in memory and writes them back in batches.
+
+    Each flush issues one `UPDATE ... SET field = field + n` per distinct
+    (model, field, n) group, so concurrent increments are never lost and
+    `updated_at` is left untouched. Values read from the database lag behind
+    by at most one flush interval; use `pending()` to add the unflushed part.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pending = defaultdict(int)
+        self._thread = None
+
+    def increment(self, model, field, pk, amount=1):
+        with self._lock:
+            self._pending[(model, field, pk)] += amount
+            self._ensure_flusher()
+
+    def pending(self, model, field, pk):
+        with self._lock:
+            return self._pending.get((model, field, pk), 0)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+        if not pending:
+            return 0
+
+        groups = defaultdict(list)
+        for (model, field, pk), amount in pending.items():
+            groups[(model, field, amount)].append(pk)
+
+        try:
+            with transaction.atomic():
+                for (model, field, amount), pks in groups.items():
+                    model.objects.filter(pk__in=pks).update(**{field: F(field) + amount})
+        except Exception:
+            logger.exception('Failed to flush %d counter increments', len(pending))
+            with self._lock:
+                for key, amount in pending.items():
+                    self._pending[key] += amount
+            return 0
+        return len(pending)
+
+    def _ensure_flusher(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='counter-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        event = threading.Event()
+        while not event.wait(self.interval):
+            self.flush()
+            close_old_connections()
+
+
+counters = CounterBuffer(interval=settings.COUNTER_FLUSH_INTERVAL)
+atexit.register(counters.flush)
@@ -0,0 +1,216 @@
+import asyncio
+import glob
+import itertools
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from urllib.parse import parse_qs
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 20
+
+
+class Subscription:
+    """One SSE client: a small bounded queue drained on its event loop."""
+
+    def __init__(self, loop, topics, size):
+        self.loop = loop
+        self.topics = topics
+        self.queue = asyncio.Queue(maxsize=size)
+        self.overflowed = False
+
+    def wants(self, event):
+        return not self.topics or event['topic'] in self.topics
+
+    def push(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A client that can't keep up is told to refetch everything instead
+            self.overflowed = True
+
+
+class EventHub:
+    """
+    In-process pub/sub between model signals (any thread) and SSE streams
+    (an asyncio loop). Publishing never blocks: events are handed to each
+    subscriber's loop with call_soon_threadsafe.
+    """
+
+    def __init__(self, queue_size):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def subscribe(self, topics):
+        subscription = Subscription(asyncio.get_running_loop(), topics, self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def deliver(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if subscription.wants(event):
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.push, event)
+                except RuntimeError:  # loop closed
+                    self.unsubscribe(subscription)
+
+
+class SocketFanout:
+    """
+    Relays events between processes on one host through unix datagram
+    sockets in `directory`: every process that serves streams binds
+    `<pid>.sock`, and publishers send each event to every socket there.
+    Sockets left behind by dead processes are removed on first refusal.
+    """
+
+    def __init__(self, directory, hub):
+        self.directory = directory
+        self.hub = hub
+        self.path = None
+        self._lock = threading.Lock()
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+
+    def listen(self):
+        with self._lock:
+            if self.path is not None:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f'{os.getpid()}.sock')
+            if os.path.exists(path):
+                os.unlink(path)
+            receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            receiver.bind(path)
+            self.path = path
+        threading.Thread(target=self._receive, args=(receiver,), name='event-fanout', daemon=True).start()
+
+    def _receive(self, receiver):
+        while True:
+            data = receiver.recv(65536)
+            try:
+                self.hub.deliver(json.loads(data))
+            except ValueError:
+                logger.warning('Dropped malformed event datagram')
+
+    def send(self, event):
+        data = json.dumps(event).encode()
+        for path in glob.glob(os.path.join(self.directory, '*.sock')):
+            if path == self.path:
+                continue
+            try:
+                self._sender.sendto(data, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except OSError as exc:  # receiver's buffer is full
+                logger.warning('Dropped event for %s: %s', path, exc)
+
+
+hub = EventHub(settings.EVENT_STREAM_QUEUE_SIZE)
+fanout = SocketFanout(settings.EVENT_BROKER_DIR, hub) if settings.EVENT_BROKER_DIR else None
+event_ids = itertools.count(1)
+
+
+def publish(topic, action, ids, **extra):
+    """Announce that items of `topic` changed; call after the transaction commits."""
+    event = {'topic': topic, 'action': action, 'ids': list(ids), 'time': time.time(), **extra}
+    hub.deliver(event)
+    if fanout is not None:
+        fanout.send(event)
+
+
+def format_event(event):
+    return f'id: {next(event_ids)}\nevent: {event["topic"]}\ndata: {json.dumps(event)}\n\n'.encode()
+
+
+def allowed_origin(scope):
+    origin = dict(scope['headers']).get(b'origin', b'').decode()
+    if origin and (settings.CORS_ALLOW_ALL_ORIGINS or origin in settings.CORS_ALLOWED_ORIGINS):
+        return origin
+    return None
+
+
+async def send_response(send, status, body):
+    await send({'type': 'http.response.start', 'status': status, 'headers': [(b'content-type', b'text/plain')]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def sse_application(scope, receive, send):
+    """
+    GET /api/events/?topics=blog,volumes streams content-change events.
+
+    Served as a bare ASGI app so an idle client costs one coroutine and a
+    small queue, not a worker thread and a Django request.
+    """
+    if scope['method'] not in ('GET', 'HEAD'):
+        return await send_response(send, 405, b'Method not allowed')
+    if len(hub) >= settings.EVENT_STREAM_MAX_CLIENTS:
+        return await send_response(send, 503, b'Too many listeners')
+    query = parse_qs(scope['query_string'].decode())
+    topics = {t for value in query.get('topics', []) for t in value.split(',') if t}
+    headers = [
+        (b'content-type', b'text/event-stream'),
+        (b'cache-control', b'no-cache'),
+        (b'x-accel-buffering', b'no'),
+    ]
+    origin = allowed_origin(scope)
+    if origin:
+        headers += [(b'access-control-allow-origin', origin.encode()), (b'vary', b'Origin')]
+    if scope['method'] == 'HEAD':
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+
+    if fanout is not None:
+        fanout.listen()
+    subscription = hub.subscribe(topics)
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b'retry: 5000\n\n', 'more_body': True})
+        while True:
+            next_event = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait(
+                {next_event, disconnected}, timeout=HEARTBEAT_INTERVAL, return_when=asyncio.FIRST_COMPLETED,
+            )
+            if disconnected in done:
+                next_event.cancel()
+                break
+            if next_event in done:
+                chunk = format_event(next_event.result())
+            else:
+                next_event.cancel()
+                chunk = b': ping\n\n'
+            if subscription.overflowed:
+                subscription.overflowed = False
+                chunk += format_event({'topic': 'resync', 'action': 'resync', 'ids': []})
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+    except OSError:
+        pass
+    finally:
+        hub.unsubscribe(subscription)
+        disconnected.cancel()
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
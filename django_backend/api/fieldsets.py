@@ -0,0 +1,70 @@
+from django.core.exceptions import FieldDoesNotExist
+
+
+def parse_field_list(value):
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+def model_fields_for(serializer, queryset):
+    """
+    Map the serializer's fields to the model columns they read, or return
+    None when a field's source can't be resolved (e.g. a method field that
+    doesn't declare `model_fields`).
+    """
+    opts = queryset.model._meta
+    select_related = queryset.query.select_related
+    columns = {opts.pk.name}
+    for field in serializer.fields.values():
+        if field.source == '*':
+            # Whole-object fields can declare the columns they read
+            if getattr(field, 'model_fields', None) is None:
+                return None
+            columns.update(field.model_fields)
+            continue
+        attrs = field.source.split('.')
+        try:
+            model_field = opts.get_field(attrs[0])
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or model_field.many_to_many:
+            return None
+        if len(attrs) > 1 and isinstance(select_related, dict) and attrs[0] in select_related:
+            columns.add('__'.join(attrs))
+        else:
+            columns.add(attrs[0])
+    return columns
+
+
+class SparseFieldsetMixin:
+    """
+    Lets clients pick fields with `?fields=a,b`, drop them with `?omit=c`
+    or ask for optional extras with `?include=d`; uses `list_serializer_class` for list actions, and pushes the resulting
+    field set down into `.only()` so unused columns are never fetched.
+    """
+    list_serializer_class = None
+
+    def get_serializer_class(self):
+        if self.action == 'list' and self.list_serializer_class is not None:
+            return self.list_serializer_class
+        return super().get_serializer_class()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request is not None and self.request.method in ('GET', 'HEAD'):
+            context['fields'] = parse_field_list(self.request.query_params.get('fields'))
+            context['omit'] = parse_field_list(self.request.query_params.get('omit'))
+            context['include'] = parse_field_list(self.request.query_params.get('include'))
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            columns = model_fields_for(self.get_serializer(), queryset)
+            if columns:
+                related = queryset.query.select_related
+                if isinstance(related, dict):
+                    # A relation left out of .only() can't also be select_related
+                    used = {column.split('__')[0] for column in columns if '__' in column}
+                    queryset = queryset.select_related(None).select_related(*(r for r in related if r in used))
+                queryset = queryset.only(*columns)
+        return queryset
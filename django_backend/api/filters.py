@@ -0,0 +1,12 @@
+import django_filters
+
+from .models import Book
+
+
+class BookFilter(django_filters.FilterSet):
+    min_price = django_filters.NumberFilter(field_name='price', lookup_expr='gte')
+    max_price = django_filters.NumberFilter(field_name='price', lookup_expr='lte')
+
+    class Meta:
+        model = Book
+        fields = ['category', 'featured', 'min_price', 'max_price']
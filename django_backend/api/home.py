@@ -0,0 +1,62 @@
+from django.urls import reverse
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .conditional import make_etag, queryset_fingerprint
+from .models import BlogPost, PrayerTestimonial, Testimonial, Volume
+from .serializers import (
+    BlogPostListSerializer, PrayerTestimonialSerializer, TestimonialSerializer, VolumeListSerializer,
+)
+
+# (key, list route name, queryset, serializer) for each collection on the homepage
+HOME_SECTIONS = (
+    ('blog', 'blogpost-list',
+     BlogPost.objects.filter(status='published').select_related('author').order_by('-created_at'),
+     BlogPostListSerializer),
+    ('volumes', 'volume-list',
+     Volume.objects.filter(status='published').order_by('-created_at'),
+     VolumeListSerializer),
+    ('testimonials', 'testimonial-list',
+     Testimonial.objects.filter(status='published').order_by('order', '-created_at'),
+     TestimonialSerializer),
+    ('prayer_testimonials', 'prayertestimonial-list',
+     PrayerTestimonial.objects.filter(status='published').order_by('order', '-created_at'),
+     PrayerTestimonialSerializer),
+)
+
+HOME_MODELS = [queryset.model for _, _, queryset, _ in HOME_SECTIONS]
+
+
+def home_fingerprints():
+    """(count, last_modified) per section, one aggregate query each."""
+    return [queryset_fingerprint(queryset) for _, _, queryset, _ in HOME_SECTIONS]
+
+
+def home_validators(request, fingerprints):
+    """Combined ETag and Last-Modified over every section's fingerprint."""
+    parts = [part for fingerprint in fingerprints for part in fingerprint]
+    etag = make_etag('home', *parts, request.get_full_path(), request.accepted_renderer.format)
+    timestamps = [last_modified for _, last_modified in fingerprints if last_modified is not None]
+    return etag, max(timestamps, default=None)
+
+
+def home_payload(request, fingerprints):
+    """
+    The first page of each section, shaped like the section's own list
+    endpoint. Counts come from the fingerprints, so this costs one query
+    per section and no COUNT(*).
+    """
+    page_size = api_settings.PAGE_SIZE
+    payload = {}
+    for (key, route, queryset, serializer_class), (count, _) in zip(HOME_SECTIONS, fingerprints):
+        rows = list(queryset[:page_size])
+        payload[key] = {
+            'count': count,
+            'next': (
+                replace_query_param(request.build_absolute_uri(reverse(route)), 'page', 2)
+                if count > page_size else None
+            ),
+            'previous': None,
+            'results': serializer_class(rows, many=True, context={'request': request}).data,
+        }
+    return payload
@@ -0,0 +1,102 @@
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .cache import invalidate
+from .models import BlogPost, Volume, Testimonial, Book
+
+# model -> (image field, derivatives field)
+IMAGE_FIELDS = {
+    BlogPost: ('image', 'image_derivatives'),
+    Volume: ('image', 'image_derivatives'),
+    Testimonial: ('image', 'image_derivatives'),
+    Book: ('cover_image', 'cover_image_derivatives'),
+}
+
+SAVE_OPTIONS = {
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+    'avif': {'format': 'AVIF', 'quality': 60},
+}
+
+
+def available_formats():
+    Image.init()
+    return [fmt for fmt, options in SAVE_OPTIONS.items() if options['format'] in Image.SAVE]
+
+
+def derivative_name(name, width, fmt):
+    root, _ = os.path.splitext(name)
+    return f'{root}_{width}w.{"jpg" if fmt == "jpeg" else fmt}'
+
+
+def render(image, width, fmt):
+    height = round(image.height * width / image.width)
+    resized = image.resize((width, height), Image.LANCZOS)
+    if fmt == 'jpeg' and resized.mode != 'RGB':
+        resized = resized.convert('RGB')
+    buffer = io.BytesIO()
+    # No exif/icc_profile arguments: the derivative carries no metadata
+    resized.save(buffer, **SAVE_OPTIONS[fmt])
+    return buffer.getvalue()
+
+
+def generate_derivatives(field_file):
+    """
+    Write resized, metadata-free copies of `field_file` next to the original
+    and return {format: {width: storage name}}.
+    """
+    storage = field_file.storage
+    with field_file.open('rb') as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    widths = [width for width in settings.IMAGE_DERIVATIVE_WIDTHS if width < image.width] or [image.width]
+    derivatives = {}
+    for fmt in available_formats():
+        derivatives[fmt] = {}
+        for width in widths:
+            name = derivative_name(field_file.name, width, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            derivatives[fmt][str(width)] = storage.save(name, ContentFile(render(image, width, fmt)))
+    return derivatives
+
+
+def delete_derivatives(storage, derivatives, keep=()):
+    for names in (derivatives or {}).values():
+        for name in names.values():
+            if name not in keep and storage.exists(name):
+                storage.delete(name)
+
+
+def process_image(model, pk):
+    """Regenerate derivatives for one row; safe to call from a worker thread."""
+    image_field, derivatives_field = IMAGE_FIELDS[model]
+    instance = model.objects.filter(pk=pk).only(image_field, derivatives_field).first()
+    if instance is None:
+        return
+    field_file = getattr(instance, image_field)
+    previous = getattr(instance, derivatives_field)
+    derivatives = generate_derivatives(field_file) if field_file else {}
+
+    kept = {name for names in derivatives.values() for name in names.values()}
+    delete_derivatives(field_file.storage, previous, keep=kept)
+
+    # Only store the result if the image was not replaced meanwhile
+    if field_file:
+        unchanged = Q(**{image_field: field_file.name})
+    else:
+        unchanged = Q(**{image_field: ''}) | Q(**{f'{image_field}__isnull': True})
+    model.objects.filter(unchanged, pk=pk).update(
+        **{derivatives_field: derivatives, 'updated_at': timezone.now()}
+    )
+    invalidate(model)
@@ -0,0 +1,115 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import BlogPost, Volume
+
+
+def hot_paths():
+    post_id = BlogPost.objects.filter(status='published').values_list('pk', flat=True).first()
+    volume_id = Volume.objects.filter(status='published').values_list('pk', flat=True).first()
+    paths = ['/api/health/', '/api/blog/', '/api/volumes/', '/api/testimonials/']
+    if post_id:
+        paths += [f'/api/blog/{post_id}/', f'/api/blog/{post_id}/comments/']
+    if volume_id:
+        paths.append(f'/api/volumes/{volume_id}/')
+    return paths
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response; returns (status, keep_alive)."""
+    head = await reader.readuntil(b'\r\n\r\n')
+    status_line, *lines = head.decode('latin-1').split('\r\n')
+    headers = {}
+    for line in lines:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip().lower()
+    if headers.get('transfer-encoding') == 'chunked':
+        while size := int((await reader.readuntil(b'\r\n')).split(b';')[0], 16):
+            await reader.readexactly(size + 2)
+        await reader.readuntil(b'\r\n')
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return int(status_line.split()[1]), headers.get('connection') != 'close'
+
+
+async def client(url, path, deadline, latencies, errors):
+    """One connection issuing GETs back to back, reconnecting when the server closes it."""
+    request = (
+        f'GET {url.path.rstrip("/")}{path} HTTP/1.1\r\nHost: {url.netloc}\r\n'
+        'Accept: application/json\r\n\r\n'
+    ).encode()
+    writer = None
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+            started = time.perf_counter()
+            writer.write(request)
+            status, keep_alive = await read_response(reader)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(status)
+        except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+            errors.append(type(exc).__name__)
+            keep_alive = False
+        if not keep_alive and writer is not None:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run(url, path, concurrency, duration):
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(client(url, path, deadline, latencies, errors) for _ in range(concurrency)))
+    return latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure requests per second and p50/p99 latency of the hot read endpoints on running servers, '
+        'e.g. gunicorn (WSGI) against uvicorn with ASYNC_API=True (ASGI)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'targets', nargs='+', metavar='LABEL=URL',
+            help='Servers to compare, e.g. wsgi=http://127.0.0.1:8000 asgi=http://127.0.0.1:8001',
+        )
+        parser.add_argument('--path', action='append', dest='paths', help='Endpoint to load (repeatable)')
+        parser.add_argument('--concurrency', type=int, default=50, help='Concurrent connections per endpoint')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds per endpoint')
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['targets']:
+            label, _, url = target.rpartition('=')
+            url = urlsplit(url)
+            if url.scheme != 'http' or not url.hostname:
+                raise CommandError(f'Expected LABEL=http://host:port, got "{target}"')
+            targets.append((label or url.netloc, url))
+        paths = options['paths'] or hot_paths()
+
+        self.stdout.write(f'{"server":<8} {"endpoint":<28} {"requests":>9} {"errors":>7} {"rps":>9} '
+                          f'{"p50 ms":>8} {"p99 ms":>8}')
+        for path in paths:
+            for label, url in targets:
+                latencies, errors = asyncio.run(run(url, path, options['concurrency'], options['duration']))
+                line = (
+                    f'{label:<8} {path:<28} {len(latencies):>9} {len(errors):>7} '
+                    f'{len(latencies) / options["duration"]:>9.1f} '
+                    f'{percentile(latencies, 0.5) * 1000:>8.1f} {percentile(latencies, 0.99) * 1000:>8.1f}'
+                )
+                self.stdout.write(self.style.ERROR(line) if errors else line)
+                if errors and options['verbosity'] > 1:
+                    self.stdout.write(f'  first errors: {errors[:5]}')
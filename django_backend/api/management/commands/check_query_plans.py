@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.models import BlogPost, Volume, Testimonial, PrayerTestimonial, Book, Comment
+
+
+def hot_queries():
+    post_id = Comment.objects.values_list('post_id', flat=True).first() or 0
+    return {
+        'blog list': BlogPost.objects.filter(status='published').order_by('-created_at')[:20],
+        'volume list': Volume.objects.filter(status='published').order_by('-created_at')[:20],
+        'testimonial list': Testimonial.objects.filter(status='published').order_by('order', '-created_at')[:20],
+        'prayer testimonial list': PrayerTestimonial.objects.filter(status='published').order_by('order', '-created_at')[:20],
+        'book list': Book.objects.filter(status='published').order_by('-featured', '-created_at')[:20],
+        'post comments': Comment.objects.filter(post_id=post_id, status='approved').order_by('-created_at'),
+    }
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot public queries and fail if any needs a sequential scan or a sort'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Query plans can only be checked against PostgreSQL')
+
+        failures = []
+        with transaction.atomic():
+            # Small tables make a seq scan the cheapest plan; disable it so the
+            # check reports whether a usable index exists at all.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            for name, queryset in hot_queries().items():
+                plan = queryset.explain()
+                bad = [node for node in ('Seq Scan', 'Sort') if node in plan]
+                status = self.style.ERROR('FAIL') if bad else self.style.SUCCESS('ok')
+                self.stdout.write(f'{status} {name}')
+                if bad or options['verbosity'] > 1:
+                    self.stdout.write(plan)
+                if bad:
+                    failures.append(name)
+
+        if failures:
+            raise CommandError(f'No index access path for: {", ".join(failures)}')
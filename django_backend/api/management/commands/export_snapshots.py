@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.snapshots import export_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Write static JSON and HTML snapshots of published blog posts and volumes to SNAPSHOT_ROOT'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rewrite every file, even if unchanged')
+
+    def handle(self, *args, **options):
+        if not settings.SNAPSHOT_ROOT:
+            raise CommandError('Set SNAPSHOT_ROOT to export snapshots')
+        writer, html = export_snapshots(force=options['force'])
+        if not html:
+            self.stderr.write('Frontend index.html not found; wrote JSON snapshots only')
+        self.stdout.write(
+            f'Wrote {writer.written}, unchanged {writer.unchanged}, removed {writer.removed} '
+            f'snapshot(s) in {settings.SNAPSHOT_ROOT}'
+        )
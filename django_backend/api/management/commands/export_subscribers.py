@@ -0,0 +1,24 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from api.models import Subscriber
+from api.subscribers import export_rows
+
+
+class Command(BaseCommand):
+    help = 'Export subscribers as CSV to a file or stdout'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Defaults to stdout')
+        parser.add_argument('--status', choices=[value for value, _ in Subscriber.STATUS_CHOICES])
+
+    def handle(self, *args, **options):
+        queryset = Subscriber.objects.all()
+        if options['status']:
+            queryset = queryset.filter(status=options['status'])
+        if options['output']:
+            with open(options['output'], 'w', newline='') as f:
+                f.writelines(export_rows(queryset))
+        else:
+            sys.stdout.writelines(export_rows(queryset))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from api.images import IMAGE_FIELDS, process_image
+
+
+class Command(BaseCommand):
+    help = 'Generate responsive image derivatives for existing uploads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate images that already have derivatives')
+
+    def handle(self, *args, **options):
+        for model, (image_field, derivatives_field) in IMAGE_FIELDS.items():
+            queryset = model.objects.exclude(**{image_field: ''}).exclude(**{f'{image_field}__isnull': True})
+            if not options['force']:
+                queryset = queryset.filter(Q(**{derivatives_field: {}}) | Q(**{f'{derivatives_field}__isnull': True}))
+            for pk in queryset.values_list('pk', flat=True).iterator():
+                try:
+                    process_image(model, pk)
+                except Exception as exc:
+                    self.stderr.write(f'{model._meta.label} {pk}: {exc}')
+                else:
+                    self.stdout.write(f'{model._meta.label} {pk}: done')
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from api.subscribers import import_subscribers
+
+
+class Command(BaseCommand):
+    help = 'Import subscribers from a CSV file with an "email" column (optional "name" and "status")'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--encoding', default='utf-8-sig')
+
+    def handle(self, *args, **options):
+        with open(options['path'], encoding=options['encoding'], newline='') as f:
+            stats = import_subscribers(f, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            '{rows} rows: {created} created, {existing} already subscribed, '
+            '{duplicates} duplicates, {invalid} invalid'.format(**stats)
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from api.audio import process_audio
+from api.models import Volume
+
+
+class Command(BaseCommand):
+    help = 'Compute duration, waveform peaks and renditions for uploaded volume audio'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Reprocess volumes that already have metadata')
+
+    def handle(self, *args, **options):
+        queryset = Volume.objects.exclude(audio_file='').exclude(audio_file__isnull=True)
+        if not options['force']:
+            queryset = queryset.filter(audio_size__isnull=True)
+        for pk in queryset.values_list('pk', flat=True).iterator():
+            try:
+                process_audio(Volume, pk)
+            except Exception as exc:
+                self.stderr.write(f'Volume {pk}: {exc}')
+            else:
+                self.stdout.write(f'Volume {pk}: done')
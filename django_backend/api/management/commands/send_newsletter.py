@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import NewsletterCampaign
+from api.newsletter import send_campaign
+
+
+class Command(BaseCommand):
+    help = 'Send (or resume sending) a newsletter campaign to active subscribers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('campaign_id', type=int)
+        parser.add_argument('--batch-size', type=int, help='Recipients per SMTP connection')
+        parser.add_argument('--rate', type=float, help='Messages per second (0 disables throttling)')
+
+    def handle(self, *args, **options):
+        try:
+            campaign = NewsletterCampaign.objects.get(pk=options['campaign_id'])
+        except NewsletterCampaign.DoesNotExist:
+            raise CommandError(f'Campaign {options["campaign_id"]} does not exist')
+        if campaign.status == 'sent':
+            raise CommandError(f'Campaign "{campaign}" has already been sent')
+
+        campaign = send_campaign(
+            campaign, batch_size=options['batch_size'], rate=options['rate'],
+            stdout=self.stdout if options['verbosity'] > 1 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'"{campaign}": {campaign.sent_count} sent, {campaign.failed_count} failed, '
+            f'{campaign.bounced_count} bounced'
+        ))
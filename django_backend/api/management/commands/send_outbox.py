@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.outbox import send_batch
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued notification emails from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain what is due now and exit')
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--interval', type=float, default=5, help='Seconds to sleep when the outbox is empty')
+
+    def handle(self, *args, **options):
+        while True:
+            sent = send_batch(options['batch_size'])
+            if sent:
+                self.stdout.write(f'Processed {sent} message(s)')
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:26
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+SEARCH_FIELDS = {
+    'blogpost': {'title': 'A', 'tags': 'B', 'excerpt': 'B', 'content': 'C'},
+    'volume': {'title': 'A', 'description': 'B', 'content': 'C'},
+    'book': {'title': 'A', 'subtitle': 'B', 'author': 'B', 'description': 'C', 'excerpt': 'C'},
+}
+
+
+def build_search_indexes(apps, schema_editor):
+    # GIN indexes and tsvector values only exist on PostgreSQL; other
+    # backends use the in-memory fallback in api.search.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, weights in SEARCH_FIELDS.items():
+        model = apps.get_model('api', model_name)
+        table = model._meta.db_table
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {table}_search_gin ON {table} USING gin (search_vector)'
+        )
+        vector = None
+        for field, weight in weights.items():
+            part = SearchVector(field, weight=weight, config='english')
+            vector = part if vector is None else vector + part
+        model.objects.update(search_vector=vector)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name in SEARCH_FIELDS:
+        table = apps.get_model('api', model_name)._meta.db_table
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_search_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_book'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='volume',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(build_search_indexes, drop_search_indexes),
+    ]
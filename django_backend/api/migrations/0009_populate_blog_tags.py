@@ -0,0 +1,60 @@
+from django.db import migrations
+from django.db.models import Count
+from django.utils.text import slugify
+
+
+def parse_tags(text):
+    tags = {}
+    for name in (text or '').split(','):
+        name = name.strip().lstrip('#').strip()
+        slug = slugify(name)[:100]
+        if slug and slug not in tags:
+            tags[slug] = name[:100]
+    return tags
+
+
+def populate_tags(apps, schema_editor):
+    BlogPost = apps.get_model('api', 'BlogPost')
+    Tag = apps.get_model('api', 'Tag')
+    BlogPostTag = apps.get_model('api', 'BlogPostTag')
+
+    post_tags = {}
+    names = {}
+    for post_id, text in BlogPost.objects.values_list('pk', 'tags').iterator():
+        tags = parse_tags(text)
+        post_tags[post_id] = list(tags)
+        for slug, name in tags.items():
+            names.setdefault(slug, name)
+
+    Tag.objects.bulk_create(
+        [Tag(name=name, slug=slug) for slug, name in names.items()],
+        ignore_conflicts=True,
+    )
+    tag_ids = dict(Tag.objects.values_list('slug', 'pk'))
+    BlogPostTag.objects.bulk_create(
+        [
+            BlogPostTag(post_id=post_id, tag_id=tag_ids[slug])
+            for post_id, slugs in post_tags.items()
+            for slug in slugs
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+    counts = (
+        BlogPostTag.objects.filter(post__status='published')
+        .values('tag_id').annotate(total=Count('pk'))
+    )
+    for row in counts:
+        Tag.objects.filter(pk=row['tag_id']).update(post_count=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_blog_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_populate_blog_tags'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['-created_at', '-id'], name='blogpost_pub_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['-created_at', '-id'], name='comment_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['-created_at', '-id'], name='contactmessage_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prayerrequest',
+            index=models.Index(fields=['-created_at', '-id'], name='prayerrequest_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prayertestimonial',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['order', '-created_at', '-id'], name='prayertestimonial_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscriber',
+            index=models.Index(fields=['-subscribed_at', '-id'], name='subscriber_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testimonial',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['order', '-created_at', '-id'], name='testimonial_pub_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='volume',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['-created_at', '-id'], name='volume_pub_keyset_idx'),
+        ),
+    ]
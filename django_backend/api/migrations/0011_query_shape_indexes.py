@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['status', '-created_at'], name='blogpost_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['-featured', '-created_at', '-id'], name='book_pub_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'status', '-created_at'], name='comment_post_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prayerrequest',
+            index=models.Index(fields=['status', '-created_at'], name='prayerrequest_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='volume',
+            index=models.Index(fields=['status', '-created_at'], name='volume_status_created_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:49
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_counts(apps, schema_editor):
+    ModerationCount = apps.get_model('api', 'ModerationCount')
+    for model_name in ('Comment', 'PrayerRequest'):
+        model = apps.get_model('api', model_name)
+        counts = {value: 0 for value, _ in model._meta.get_field('status').choices}
+        counts.update(model.objects.values_list('status').annotate(n=Count('pk')).order_by())
+        ModerationCount.objects.bulk_create([
+            ModerationCount(model=f'api.{model_name.lower()}', status=status, count=count)
+            for status, count in counts.items()
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_newsletter_campaigns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModerationCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('status', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='comment_status_keyset_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='moderationcount',
+            constraint=models.UniqueConstraint(fields=('model', 'status'), name='unique_moderation_count'),
+        ),
+        migrations.RunPython(populate_counts, migrations.RunPython.noop),
+    ]
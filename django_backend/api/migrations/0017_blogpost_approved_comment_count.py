@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:51
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_approved_comments(apps, schema_editor):
+    BlogPost = apps.get_model('api', 'BlogPost')
+    Comment = apps.get_model('api', 'Comment')
+    approved = Comment.objects.filter(
+        post=OuterRef('pk'), status='approved',
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+    BlogPost.objects.update(approved_comment_count=Coalesce(Subquery(approved), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_moderation_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='approved_comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_approved_comments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_blogpost_approved_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['category', '-featured', '-created_at', '-id'], name='book_pub_category_idx'),
+        ),
+    ]
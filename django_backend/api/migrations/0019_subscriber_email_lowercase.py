@@ -0,0 +1,52 @@
+from django.db import migrations, models
+from django.db.models import Count, Min
+from django.db.models.functions import Lower
+
+
+def merge_case_duplicates(apps, schema_editor):
+    """
+    Lower-case every subscriber email. Rows that differ only by case are
+    merged into the most recently updated one, which carries the latest
+    status; the earliest subscribed_at and the first non-empty name are
+    kept, and deliveries are moved to the surviving row.
+    """
+    Subscriber = apps.get_model('api', 'Subscriber')
+    NewsletterDelivery = apps.get_model('api', 'NewsletterDelivery')
+
+    duplicates = (
+        Subscriber.objects.annotate(lower=Lower('email')).values('lower')
+        .annotate(n=Count('pk')).filter(n__gt=1).values_list('lower', flat=True)
+    )
+    for email in list(duplicates):
+        rows = list(
+            Subscriber.objects.annotate(lower=Lower('email')).filter(lower=email).order_by('-updated_at', '-pk')
+        )
+        keep, others = rows[0], rows[1:]
+        other_ids = [row.pk for row in others]
+        sent_campaigns = NewsletterDelivery.objects.filter(subscriber=keep).values('campaign_id')
+        NewsletterDelivery.objects.filter(subscriber_id__in=other_ids).exclude(
+            campaign_id__in=sent_campaigns,
+        ).update(subscriber=keep)
+        subscribed_at = Subscriber.objects.filter(pk__in=[keep.pk, *other_ids]).aggregate(
+            first=Min('subscribed_at'),
+        )['first']
+        name = next((row.name for row in rows if row.name), '')
+        Subscriber.objects.filter(pk__in=other_ids).delete()
+        Subscriber.objects.filter(pk=keep.pk).update(email=email, name=name, subscribed_at=subscribed_at)
+
+    Subscriber.objects.exclude(email=Lower('email')).update(email=Lower('email'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_book_category_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_case_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='subscriber',
+            constraint=models.UniqueConstraint(Lower('email'), name='subscriber_email_lower_unique'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+import html
+import re
+
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import TextField, Value
+
+SEARCH_FIELDS = {
+    'blogpost': {'title': 'A', 'tags': 'B', 'excerpt': 'B', 'content': 'C'},
+    'volume': {'title': 'A', 'description': 'B', 'content': 'C'},
+    'book': {'title': 'A', 'subtitle': 'B', 'author': 'B', 'description': 'C', 'excerpt': 'C'},
+}
+TAG_RE = re.compile(r'<[^>]*>')
+
+
+def plain_text(text):
+    return html.unescape(TAG_RE.sub(' ', text or ''))
+
+
+def rebuild_search_vectors(apps, schema_editor):
+    # Vectors were built from raw HTML; rebuild them from the text alone
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, weights in SEARCH_FIELDS.items():
+        model = apps.get_model('api', model_name)
+        for row in model.objects.only('pk', *weights).iterator(chunk_size=500):
+            vector = None
+            for field, weight in weights.items():
+                text = Value(plain_text(getattr(row, field)), output_field=TextField())
+                part = SearchVector(text, weight=weight, config='english')
+                vector = part if vector is None else vector + part
+            model.objects.filter(pk=row.pk).update(search_vector=vector)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_subscriber_email_lowercase'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_search_vectors, migrations.RunPython.noop),
+    ]
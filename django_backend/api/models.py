@@ -1,5 +1,8 @@
 from django.db import models
+from django.db.models.functions import Lower
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class BlogPost(models.Model):
     STATUS_CHOICES = [
@@ -23,20 +26,50 @@ class BlogPost(models.Model):
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
     tags = models.TextField(blank=True)
     image = models.ImageField(upload_to='blog_images/', blank=True, null=True)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
     author = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     views = models.IntegerField(default=0)
+    approved_comment_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Blog Post'
         verbose_name_plural = 'Blog Posts'
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='blogpost_pub_keyset_idx', condition=models.Q(status='published')),
+            models.Index(fields=['status', '-created_at'], name='blogpost_status_created_idx'),
+        ]
     
     def __str__(self):
         return self.title
 
+class Tag(models.Model):
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True)
+    post_count = models.IntegerField(default=0, help_text="Published posts with this tag")
+
+    class Meta:
+        ordering = ['-post_count', 'name']
+
+    def __str__(self):
+        return self.name
+
+class BlogPostTag(models.Model):
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='tag_links')
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='post_links')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'tag'], name='unique_blogpost_tag'),
+        ]
+        indexes = [
+            models.Index(fields=['tag', 'post'], name='api_blogposttag_tag_post_idx'),
+        ]
+
 class Volume(models.Model):
     STATUS_CHOICES = [
         ('draft', 'Draft'),
@@ -58,16 +91,26 @@ class Volume(models.Model):
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
     price = models.CharField(max_length=20)
     image = models.ImageField(upload_to='volume_images/', blank=True, null=True)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     audio_file = models.FileField(upload_to='volume_audio/', blank=True, null=True, help_text="Upload audio file (MP3, WAV, etc.)")
+    audio_duration = models.FloatField(blank=True, null=True, editable=False, help_text="Seconds")
+    audio_size = models.BigIntegerField(blank=True, null=True, editable=False, help_text="Bytes")
+    audio_renditions = models.JSONField(default=dict, blank=True, editable=False)
+    waveform_peaks = models.JSONField(default=list, blank=True, editable=False)
     download_link = models.URLField(blank=True)
     content = models.TextField(blank=True)
     downloads = models.IntegerField(default=0)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='published')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='volume_pub_keyset_idx', condition=models.Q(status='published')),
+            models.Index(fields=['status', '-created_at'], name='volume_status_created_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -104,6 +147,10 @@ class PrayerRequest(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='prayerrequest_keyset_idx'),
+            models.Index(fields=['status', '-created_at'], name='prayerrequest_status_idx'),
+        ]
     
     def __str__(self):
         return f"Prayer from {self.name or 'Anonymous'} - {self.category}"
@@ -125,6 +172,9 @@ class ContactMessage(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='contactmessage_keyset_idx'),
+        ]
 
 class Subscriber(models.Model):
     STATUS_CHOICES = [
@@ -139,6 +189,16 @@ class Subscriber(models.Model):
     subscribed_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-subscribed_at', '-id'], name='subscriber_keyset_idx'),
+            models.Index(fields=['id'], name='subscriber_active_idx', condition=models.Q(status='active')),
+        ]
+        constraints = [
+            # Emails are stored lower-cased; this keeps case variants out too
+            models.UniqueConstraint(Lower('email'), name='subscriber_email_lower_unique'),
+        ]
+
 class Comment(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -155,6 +215,11 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='comment_keyset_idx'),
+            models.Index(fields=['post', 'status', '-created_at'], name='comment_post_status_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='comment_status_keyset_idx'),
+        ]
 
 class Testimonial(models.Model):
     STATUS_CHOICES = [
@@ -167,6 +232,7 @@ class Testimonial(models.Model):
     author_role = models.CharField(max_length=100, blank=True)
     quote = models.TextField()
     image = models.ImageField(upload_to='testimonial_images/', blank=True, null=True)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='published')
     order = models.IntegerField(default=0, help_text="Order of display (lower numbers first)")
     created_at = models.DateTimeField(auto_now_add=True)
@@ -176,6 +242,9 @@ class Testimonial(models.Model):
         ordering = ['order', '-created_at']
         verbose_name = 'Testimonial'
         verbose_name_plural = 'Testimonials'
+        indexes = [
+            models.Index(fields=['order', '-created_at', '-id'], name='testimonial_pub_keyset_idx', condition=models.Q(status='published')),
+        ]
     
     def __str__(self):
         return f"{self.author_name} - {self.quote[:50]}..."
@@ -211,6 +280,9 @@ class PrayerTestimonial(models.Model):
         ordering = ['order', '-created_at']
         verbose_name = 'Prayer Testimonial'
         verbose_name_plural = 'Prayer Testimonials'
+        indexes = [
+            models.Index(fields=['order', '-created_at', '-id'], name='prayertestimonial_keyset_idx', condition=models.Q(status='published')),
+        ]
     
     def __str__(self):
         return f"{self.author_name} - {self.category} - {self.testimony[:50]}..."
@@ -240,6 +312,7 @@ class Book(models.Model):
     pages = models.IntegerField(blank=True, null=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     cover_image = models.ImageField(upload_to='book_covers/', blank=True, null=True)
+    cover_image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     preview_pdf = models.FileField(upload_to='book_previews/', blank=True, null=True, help_text="Upload preview PDF")
     purchase_link = models.URLField(blank=True, help_text="Link to purchase (Amazon, etc.)")
     publication_date = models.DateField(blank=True, null=True)
@@ -248,11 +321,16 @@ class Book(models.Model):
     sales_count = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ['-featured', '-created_at']
         verbose_name = 'Book'
         verbose_name_plural = 'Books'
+        indexes = [
+            models.Index(fields=['-featured', '-created_at', '-id'], name='book_pub_featured_idx', condition=models.Q(status='published')),
+            models.Index(fields=['category', '-featured', '-created_at', '-id'], name='book_pub_category_idx', condition=models.Q(status='published')),
+        ]
     
     def __str__(self):
         return self.title
@@ -260,4 +338,96 @@ class Book(models.Model):
 class SiteSetting(models.Model):
     setting_key = models.CharField(max_length=100, unique=True)
     setting_value = models.TextField(blank=True)
-    updated_at = models.DateTimeField(auto_now=True)
\ No newline at end of file
+    updated_at = models.DateTimeField(auto_now=True)
+
+class OutboxMessage(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    recipients = models.JSONField(default=list)
+    reply_to = models.EmailField(blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['next_attempt_at'], name='outbox_pending_idx', condition=models.Q(status='pending')),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} ({self.status})"
+
+class NewsletterCampaign(models.Model):
+    STATUS_CHOICES = [
+        ('draft', 'Draft'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
+    # Checkpoint: subscribers are sent to in id order, so a resumed run
+    # continues after the last id whose batch was recorded.
+    last_subscriber_id = models.PositiveBigIntegerField(default=0)
+    sent_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    bounced_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return self.subject
+
+class NewsletterDelivery(models.Model):
+    STATUS_CHOICES = [
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+        ('bounced', 'Bounced'),
+    ]
+
+    campaign = models.ForeignKey(NewsletterCampaign, on_delete=models.CASCADE, related_name='deliveries')
+    subscriber = models.ForeignKey(Subscriber, on_delete=models.CASCADE, related_name='deliveries')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'subscriber'], name='unique_campaign_subscriber'),
+        ]
+        indexes = [
+            models.Index(fields=['campaign', 'status'], name='delivery_campaign_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.campaign} -> {self.subscriber} ({self.status})"
+
+class ModerationCount(models.Model):
+    """Per-status row counts for moderated models, kept current by api.moderation."""
+    model = models.CharField(max_length=100)  # model label, e.g. "api.comment"
+    status = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['model', 'status'], name='unique_moderation_count'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.status}: {self.count}"
@@ -0,0 +1,97 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .cache import invalidate
+from .comments import refresh_comment_counts
+from .events import publish
+from .models import Comment, ModerationCount, PrayerRequest
+
+# URL name -> (model, status shown in the queue by default)
+MODERATED_MODELS = {
+    'comments': (Comment, 'pending'),
+    'prayers': (PrayerRequest, 'new'),
+}
+
+MAX_BULK_IDS = 1000
+
+
+def statuses(model):
+    return [value for value, _ in model.STATUS_CHOICES]
+
+
+def adjust_counts(model, deltas):
+    """Apply {status: delta} to the counter table with F() updates."""
+    label = model._meta.label_lower
+    for status, delta in deltas.items():
+        if not delta:
+            continue
+        updated = ModerationCount.objects.filter(model=label, status=status).update(count=F('count') + delta)
+        if not updated:
+            recount(model)
+            return
+
+
+def recount(model):
+    """Rebuild one model's counters from a full COUNT(*) per status."""
+    label = model._meta.label_lower
+    counts = dict.fromkeys(statuses(model), 0)
+    counts.update(model.objects.values_list('status').annotate(n=Count('pk')).order_by())
+    with transaction.atomic():
+        for status, count in counts.items():
+            ModerationCount.objects.update_or_create(model=label, status=status, defaults={'count': count})
+
+
+def status_counts():
+    rows = ModerationCount.objects.values_list('model', 'status', 'count')
+    by_label = {}
+    for label, status, count in rows:
+        by_label.setdefault(label, {})[status] = count
+    result = {}
+    for name, (model, _) in MODERATED_MODELS.items():
+        counts = by_label.get(model._meta.label_lower)
+        if counts is None:
+            recount(model)
+            return status_counts()
+        result[name] = {status: counts.get(status, 0) for status in statuses(model)}
+    return result
+
+
+def transition(model, ids, status):
+    """
+    Move the given rows to `status` with a single UPDATE.
+
+    The rows are locked first so the counter deltas match exactly what the
+    UPDATE changed, even with concurrent moderators. Returns the changed
+    rows as (pk, previous status) pairs. Model signals are not sent; the
+    cache version is bumped instead.
+    """
+    with transaction.atomic():
+        changed = list(
+            model.objects.select_for_update()
+            .filter(pk__in=ids).exclude(status=status)
+            .values_list('pk', 'status')
+        )
+        if not changed:
+            return []
+        fields = {'status': status}
+        if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+            fields['updated_at'] = timezone.now()
+        model.objects.filter(pk__in=[pk for pk, _ in changed]).update(**fields)
+
+        deltas = Counter()
+        for _, previous in changed:
+            deltas[previous] -= 1
+        deltas[status] += len(changed)
+        adjust_counts(model, deltas)
+        if model is Comment and (status == 'approved' or 'approved' in deltas):
+            refresh_comment_counts(
+                Comment.objects.filter(pk__in=[pk for pk, _ in changed]).values('post_id')
+            )
+            transaction.on_commit(lambda: publish(
+                'comments', 'changed' if status == 'approved' else 'removed', [pk for pk, _ in changed],
+            ))
+    invalidate(model)
+    return changed
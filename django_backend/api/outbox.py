@@ -0,0 +1,111 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(subject, body, recipients, reply_to=''):
+    """Queue an email; call inside the transaction that creates the submission."""
+    return OutboxMessage.objects.create(
+        subject=subject, body=body, recipients=list(recipients), reply_to=reply_to or '',
+    )
+
+
+def notify_prayer_request(prayer):
+    name = 'Anonymous' if prayer.is_anonymous else (prayer.name or 'Anonymous')
+    return enqueue(
+        f'New prayer request ({prayer.get_category_display()})',
+        f'From: {name}\nSharing allowed: {"yes" if prayer.allow_sharing else "no"}\n\n{prayer.request}',
+        [settings.PRAYER_TEAM_EMAIL],
+        reply_to='' if prayer.is_anonymous else prayer.email,
+    )
+
+
+def notify_contact_message(message):
+    return enqueue(
+        f'Contact form: {message.subject}',
+        f'From: {message.name} <{message.email}>\n\n{message.message}',
+        [settings.CONTACT_EMAIL],
+        reply_to=message.email,
+    )
+
+
+def notify_comment(comment):
+    return enqueue(
+        f'New reflection awaiting moderation on "{comment.post.title}"',
+        f'From: {comment.author_name}\n\n{comment.content}',
+        [settings.CONTACT_EMAIL],
+    )
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(
+        settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.OUTBOX_RETRY_MAX_SECONDS,
+    ))
+
+
+def record_failure(message, error, now):
+    message.attempts += 1
+    message.last_error = str(error)[:2000]
+    if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        message.status = 'failed'
+    else:
+        message.next_attempt_at = now + retry_delay(message.attempts)
+
+
+def send_batch(batch_size=50):
+    """
+    Send up to `batch_size` due messages over one SMTP connection.
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so several
+    workers can drain the outbox concurrently without sending twice.
+    Returns the number of messages attempted.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if not batch:
+            return 0
+
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as exc:
+            logger.warning('Could not connect to the mail server: %s', exc)
+            for message in batch:
+                record_failure(message, exc, now)
+        else:
+            try:
+                for message in batch:
+                    email = EmailMessage(
+                        message.subject, message.body, settings.DEFAULT_FROM_EMAIL, message.recipients,
+                        reply_to=[message.reply_to] if message.reply_to else None,
+                        connection=connection,
+                    )
+                    try:
+                        email.send()
+                    except Exception as exc:
+                        logger.warning('Failed to send outbox message %s: %s', message.pk, exc)
+                        record_failure(message, exc, now)
+                    else:
+                        message.status = 'sent'
+                        message.sent_at = timezone.now()
+            finally:
+                connection.close()
+
+        OutboxMessage.objects.bulk_update(
+            batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'],
+        )
+    return len(batch)
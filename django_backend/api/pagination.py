@@ -0,0 +1,119 @@
+import base64
+import json
+from functools import reduce
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over a unique composite ordering such as
+    ('-created_at', '-id').
+
+    The cursor holds the ordering values of the last row seen, so each page
+    is a single indexed range scan with no OFFSET and no COUNT(*).
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+
+    def __init__(self, ordering):
+        self.ordering = tuple(ordering)
+
+    def encode_cursor(self, instance, reverse=False):
+        values = []
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip('-'))
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        payload = json.dumps({'v': values, 'r': reverse}, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, model, cursor):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            values = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, payload['v'], strict=True)
+            ]
+            return values, bool(payload.get('r'))
+        except Exception:
+            raise NotFound('Invalid cursor')
+
+    def seek_filter(self, values, reverse):
+        clauses = []
+        for i, field in enumerate(self.ordering):
+            descending = field.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            clause = Q(**{f'{field.lstrip("-")}__{lookup}': values[i]})
+            for previous, value in zip(self.ordering[:i], values[:i]):
+                clause &= Q(**{previous.lstrip('-'): value})
+            clauses.append(clause)
+        return reduce(lambda a, b: a | b, clauses)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = remove_query_param(request.build_absolute_uri(), 'page')
+        cursor = request.query_params.get(self.cursor_query_param)
+        reverse = False
+        ordering = self.ordering
+        if cursor:
+            values, reverse = self.decode_cursor(queryset.model, cursor)
+            queryset = queryset.filter(self.seek_filter(values, reverse))
+        if reverse:
+            ordering = tuple(f[1:] if f.startswith('-') else f'-{f}' for f in ordering)
+
+        rows = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.next = self.encode_cursor(rows[-1]) if rows else None
+            self.previous = self.encode_cursor(rows[0], reverse=True) if rows and has_more else None
+        else:
+            self.next = self.encode_cursor(rows[-1]) if rows and has_more else None
+            self.previous = self.encode_cursor(rows[0], reverse=True) if rows and cursor else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.next,
+            'previous': self.previous,
+            'results': data,
+        })
+
+
+class HybridPagination(PageNumberPagination):
+    """
+    Page-number pagination by default; keyset pagination when the client
+    sends `?pagination=cursor` or a `cursor` parameter. The choice lives in
+    the query string so that the response cache key and ETag, which are
+    built from the full path, always reflect the response shape.
+
+    Views choose the keyset ordering with `keyset_ordering`; it must end in
+    a unique column so that cursors are stable.
+    """
+    default_keyset_ordering = ('-created_at', '-id')
+
+    def use_keyset(self, request):
+        return (
+            request.query_params.get('pagination') == 'cursor'
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request):
+            ordering = getattr(view, 'keyset_ordering', self.default_keyset_ordering)
+            self.keyset = KeysetPagination(ordering)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
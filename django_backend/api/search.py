@@ -0,0 +1,262 @@
+import html
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, Func, TextField, Value
+
+from .cache import get_versions
+from .models import BlogPost, Volume, Book
+
+SEARCH_CONFIG = 'english'
+
+# type -> (model, {field: weight}, headline field)
+SEARCH_MODELS = {
+    'blog': (BlogPost, {'title': 'A', 'tags': 'B', 'excerpt': 'B', 'content': 'C'}, 'content'),
+    'volume': (Volume, {'title': 'A', 'description': 'B', 'content': 'C'}, 'description'),
+    'book': (Book, {'title': 'A', 'subtitle': 'B', 'author': 'B', 'description': 'C', 'excerpt': 'C'}, 'description'),
+}
+
+# Same defaults as PostgreSQL's ts_rank: {D, C, B, A} = {0.1, 0.2, 0.4, 1.0}
+WEIGHT_VALUES = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+# Headlines are built around control-character markers, then escaped and the
+# markers swapped for <mark>, so both backends return the same safe HTML
+START_SEL, STOP_SEL = '\x02', '\x03'
+HEADLINE_OPTIONS = {'start_sel': START_SEL, 'stop_sel': STOP_SEL, 'max_words': 35, 'min_words': 15}
+TAG_RE = re.compile(r'<[^>]*>')
+
+
+def plain_text(text):
+    """Stored content is HTML; headlines and the fallback index use its text."""
+    return html.unescape(TAG_RE.sub(' ', text or ''))
+
+
+def format_headline(text):
+    escaped = html.escape(text or '')
+    return escaped.replace(START_SEL, '<mark>').replace(STOP_SEL, '</mark>')
+
+
+def postgres_headline(raw):
+    # ts_headline ran over tag-stripped HTML, so entities are still encoded
+    return format_headline(html.unescape(raw or ''))
+
+
+class StripTags(Func):
+    function = 'regexp_replace'
+    template = "%(function)s(%(expressions)s, '<[^>]*>', ' ', 'g')"
+
+
+def search_vector(instance):
+    """
+    The weighted tsvector for one row, built from the same tag-stripped
+    text the fallback index uses, so markup is never indexed or ranked.
+    """
+    for model_class, weights, _ in SEARCH_MODELS.values():
+        if model_class is type(instance):
+            vector = None
+            for field, weight in weights.items():
+                text = Value(plain_text(getattr(instance, field)), output_field=TextField())
+                part = SearchVector(text, weight=weight, config=SEARCH_CONFIG)
+                vector = part if vector is None else vector + part
+            return vector
+    return None
+
+
+def update_search_vector(instance):
+    """Refresh the stored tsvector for one row; a no-op outside PostgreSQL."""
+    vector = search_vector(instance)
+    if vector is not None and connection.vendor == 'postgresql':
+        type(instance).objects.filter(pk=instance.pk).update(search_vector=vector)
+
+
+def published(model):
+    return model.objects.filter(status='published')
+
+
+class PostgresSearchResults:
+    """
+    Lazily ranked hits across the searchable models, sliceable by a paginator.
+
+    A slice fetches the top `stop` ranked ids from each model's GIN-indexed
+    `search_vector`, merges them, and computes headlines for the slice only.
+    """
+
+    def __init__(self, query, types):
+        self.query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+        self.types = types
+
+    def _matches(self, type_name):
+        model = SEARCH_MODELS[type_name][0]
+        return published(model).filter(search_vector=self.query)
+
+    def count(self):
+        return sum(self._matches(type_name).count() for type_name in self.types)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+
+        ranked = []
+        for type_name in self.types:
+            rows = self._matches(type_name).annotate(
+                rank=SearchRank(F('search_vector'), self.query),
+            ).order_by('-rank', '-created_at').values_list('pk', 'rank')[:stop]
+            ranked.extend((rank, type_name, pk) for pk, rank in rows)
+        ranked.sort(key=lambda hit: hit[0], reverse=True)
+        page = ranked[start:stop]
+
+        ids_by_type = defaultdict(list)
+        for _, type_name, pk in page:
+            ids_by_type[type_name].append(pk)
+
+        rows_by_key = {}
+        for type_name, ids in ids_by_type.items():
+            model, _, headline_field = SEARCH_MODELS[type_name]
+            rows = model.objects.filter(pk__in=ids).annotate(
+                headline=SearchHeadline(
+                    StripTags(headline_field), self.query, config=SEARCH_CONFIG, **HEADLINE_OPTIONS,
+                ),
+            ).values('pk', 'title', 'headline')
+            for row in rows:
+                rows_by_key[(type_name, row['pk'])] = row
+
+        return [
+            {
+                'type': type_name,
+                'id': pk,
+                'title': rows_by_key[(type_name, pk)]['title'],
+                'headline': postgres_headline(rows_by_key[(type_name, pk)]['headline']),
+                'rank': round(rank, 6),
+            }
+            for rank, type_name, pk in page
+            if (type_name, pk) in rows_by_key
+        ]
+
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+STOP_WORDS = frozenset(
+    'a an and are as at be but by for from has he her his i in is it its of on or our '
+    'she that the their them they this to was we were will with you your'.split()
+)
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall((text or '').lower()) if token not in STOP_WORDS]
+
+
+class InvertedIndex:
+    """
+    In-memory inverted index used when the database is not PostgreSQL
+    (e.g. SQLite test runs). Scores mirror ts_rank's field weights with an
+    idf factor so rarer terms count for more.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(dict)  # term -> {doc key: weighted tf}
+        self.documents = {}  # doc key -> (title, headline text)
+
+    def add(self, type_name, pk, fields, weights, title, headline_text):
+        key = (type_name, pk)
+        self.documents[key] = (title, plain_text(headline_text))
+        for field, weight in weights.items():
+            for token in tokenize(plain_text(fields.get(field))):
+                postings = self.postings[token]
+                postings[key] = postings.get(key, 0.0) + WEIGHT_VALUES[weight]
+
+    def search(self, query, types):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        candidates = None
+        for term in terms:
+            docs = {key for key in self.postings.get(term, {}) if key[0] in types}
+            candidates = docs if candidates is None else candidates & docs
+            if not candidates:
+                return []
+
+        total = len(self.documents)
+        scores = {}
+        for key in candidates:
+            score = 0.0
+            for term in terms:
+                postings = self.postings[term]
+                idf = math.log(1 + total / len(postings))
+                score += (1 + math.log(postings[key])) * idf
+            scores[key] = score
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def highlight(text, terms, max_words=HEADLINE_OPTIONS['max_words']):
+    words = (text or '').split()
+    wanted = set(terms)
+    first = next(
+        (i for i, word in enumerate(words) if set(tokenize(word)) & wanted),
+        0,
+    )
+    start = max(0, first - max_words // 3)
+    marked = []
+    for word in words[start:start + max_words]:
+        marked.append(f'{START_SEL}{word}{STOP_SEL}' if set(tokenize(word)) & wanted else word)
+    return format_headline(' '.join(marked))
+
+
+class FallbackSearchResults:
+    _lock = threading.Lock()
+    _index = None
+    _index_version = None
+
+    def __init__(self, query, types):
+        self.query = query
+        self.types = types
+        self.index = self.get_index()
+        self.hits = self.index.search(query, set(types))
+
+    @classmethod
+    def get_index(cls):
+        version = get_versions([model for model, _, _ in SEARCH_MODELS.values()])
+        with cls._lock:
+            if cls._index is None or cls._index_version != version:
+                cls._index = cls.build_index()
+                cls._index_version = version
+            return cls._index
+
+    @staticmethod
+    def build_index():
+        index = InvertedIndex()
+        for type_name, (model, weights, headline_field) in SEARCH_MODELS.items():
+            fields = ['pk', 'title', headline_field, *weights]
+            for row in published(model).values(*set(fields)):
+                index.add(type_name, row['pk'], row, weights, row['title'], row[headline_field])
+        return index
+
+    def count(self):
+        return len(self.hits)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        terms = tokenize(self.query)
+        documents = self.index.documents
+        results = []
+        for (type_name, pk), score in self.hits[index]:
+            title, text = documents[(type_name, pk)]
+            results.append({
+                'type': type_name,
+                'id': pk,
+                'title': title,
+                'headline': highlight(text, terms),
+                'rank': round(score, 6),
+            })
+        return results
+
+
+def search(query, types=None):
+    types = [t for t in (types or SEARCH_MODELS) if t in SEARCH_MODELS]
+    if connection.vendor == 'postgresql':
+        return PostgresSearchResults(query, types)
+    return FallbackSearchResults(query, types)
@@ -1,18 +1,120 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.urls import reverse
 from .models import BlogPost, Volume, PrayerRequest, ContactMessage, Subscriber, Comment, SiteSetting, Testimonial, PrayerTestimonial, Book
+from .comments import comment_previews
 
-class BlogPostSerializer(serializers.ModelSerializer):
+class ImageDerivativesField(serializers.ReadOnlyField):
+    """Renders stored image derivatives as {format: {width: absolute url}} for srcset."""
+
+    def to_representation(self, derivatives):
+        storage = default_storage
+        request = self.context.get('request')
+        urls = {}
+        for fmt, names in (derivatives or {}).items():
+            urls[fmt] = {}
+            for width, name in names.items():
+                url = storage.url(name)
+                urls[fmt][width] = request.build_absolute_uri(url) if request else url
+        return urls
+
+class AudioStreamUrlField(serializers.Field):
+    """Absolute URL of the range-capable audio stream for a volume, if it has audio."""
+    model_fields = ('audio_file',)
+
+    def __init__(self, **kwargs):
+        kwargs.update(source='*', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, volume):
+        if not volume.audio_file:
+            return None
+        url = reverse('volume_stream', kwargs={'pk': volume.pk})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+class AudioRenditionsField(serializers.ReadOnlyField):
+    """Renders stored renditions as {label: {url, bitrate, size}}."""
+
+    def to_representation(self, renditions):
+        request = self.context.get('request')
+        result = {}
+        for label, rendition in (renditions or {}).items():
+            url = default_storage.url(rendition['name'])
+            result[label] = {
+                'url': request.build_absolute_uri(url) if request else url,
+                'bitrate': rendition['bitrate'],
+                'size': rendition['size'],
+            }
+        return result
+
+class SparseFieldsetSerializer(serializers.ModelSerializer):
+    """Drops fields not selected by the `fields` / `omit` serializer context."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get('fields')
+        omitted = self.context.get('omit') or ()
+        return {
+            name: field for name, field in fields.items()
+            if name == 'id' or ((not requested or name in requested) and name not in omitted)
+        }
+
+class CommentsPreviewField(serializers.Field):
+    """
+    Latest approved comments for a post. The first call loads previews for
+    every post being serialized in one windowed query and keeps them in the
+    serializer context.
+    """
+    model_fields = ()
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, post):
+        previews = self.context.get('_comments_preview')
+        if previews is None:
+            instances = self.root.instance
+            if isinstance(instances, BlogPost):
+                instances = [instances]
+            previews = comment_previews([p.pk for p in instances], settings.COMMENT_PREVIEW_SIZE)
+            self.context['_comments_preview'] = previews
+        return previews.get(post.pk, [])
+
+class BlogPostSerializer(SparseFieldsetSerializer):
     author_name = serializers.CharField(source='author.username', read_only=True)
+    image_srcset = ImageDerivativesField(source='image_derivatives')
     
     class Meta:
         model = BlogPost
-        fields = '__all__'
+        exclude = ['search_vector', 'image_derivatives']
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        if 'comments_preview' in (self.context.get('include') or ()):
+            fields['comments_preview'] = CommentsPreviewField()
+        return fields
+
+class BlogPostListSerializer(BlogPostSerializer):
+    class Meta(BlogPostSerializer.Meta):
+        exclude = ['search_vector', 'image_derivatives', 'content']
+
+class VolumeSerializer(SparseFieldsetSerializer):
+    image_srcset = ImageDerivativesField(source='image_derivatives')
+    audio_stream_url = AudioStreamUrlField()
+    audio_renditions = AudioRenditionsField()
 
-class VolumeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Volume
-        fields = '__all__'
+        exclude = ['search_vector', 'image_derivatives']
+
+class VolumeListSerializer(VolumeSerializer):
+    class Meta(VolumeSerializer.Meta):
+        exclude = ['search_vector', 'image_derivatives', 'content', 'waveform_peaks']
 
 class PrayerRequestSerializer(serializers.ModelSerializer):
     class Meta:
@@ -29,6 +131,20 @@ class SubscriberSerializer(serializers.ModelSerializer):
         model = Subscriber
         fields = '__all__'
 
+    def validate_email(self, value):
+        return value.strip().lower()
+
+class ModerationBulkSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000)
+    status = serializers.CharField(max_length=20)
+
+class SubscribeSerializer(serializers.Serializer):
+    email = serializers.EmailField()
+    name = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+
+    def validate_email(self, value):
+        return value.strip().lower()
+
 class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
@@ -43,20 +159,29 @@ class CommentSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({'post': 'Blog post ID is required'})
         return data
 
-class TestimonialSerializer(serializers.ModelSerializer):
+class TestimonialSerializer(SparseFieldsetSerializer):
+    image_srcset = ImageDerivativesField(source='image_derivatives')
+
     class Meta:
         model = Testimonial
-        fields = '__all__'
+        exclude = ['image_derivatives']
 
-class PrayerTestimonialSerializer(serializers.ModelSerializer):
+class PrayerTestimonialSerializer(SparseFieldsetSerializer):
     class Meta:
         model = PrayerTestimonial
         fields = '__all__'
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(SparseFieldsetSerializer):
+    cover_image_srcset = ImageDerivativesField(source='cover_image_derivatives')
+
     class Meta:
         model = Book
-        fields = '__all__'
+        exclude = ['search_vector', 'cover_image_derivatives']
+        read_only_fields = ['sales_count']
+
+class BookListSerializer(BookSerializer):
+    class Meta(BookSerializer.Meta):
+        exclude = ['search_vector', 'cover_image_derivatives', 'excerpt', 'preview_pdf']
 
 class SiteSettingSerializer(serializers.ModelSerializer):
     class Meta:
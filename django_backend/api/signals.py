@@ -0,0 +1,195 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.db import transaction
+from django.dispatch import receiver
+
+from .cache import invalidate
+from .models import BlogPost, Volume, Comment, Testimonial, PrayerTestimonial, Book
+from .comments import refresh_comment_counts
+from .events import publish
+from .snapshots import export_changed
+from .moderation import MODERATED_MODELS, adjust_counts, recount
+from .search import update_search_vector
+from .tags import refresh_tag_counts, sync_post_tags
+from .images import IMAGE_FIELDS, process_image
+from .audio import process_audio
+from .tasks import run_in_background
+
+CACHED_MODELS = [BlogPost, Volume, Comment, Testimonial, PrayerTestimonial, Book]
+SEARCH_MODELS = [BlogPost, Volume, Book]
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_cached_responses(sender, **kwargs):
+    if sender in CACHED_MODELS:
+        invalidate(sender)
+
+
+@receiver(post_save)
+def refresh_search_vector(sender, instance, raw=False, **kwargs):
+    if sender in SEARCH_MODELS and not raw:
+        update_search_vector(instance)
+
+
+@receiver(post_save, sender=BlogPost)
+def sync_blog_post_tags(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_post_tags(instance)
+
+
+@receiver(pre_delete, sender=BlogPost)
+def remember_blog_post_tags(sender, instance, **kwargs):
+    instance._deleted_tag_ids = list(instance.tag_links.values_list('tag_id', flat=True))
+
+
+@receiver(post_delete, sender=BlogPost)
+def recount_deleted_blog_post_tags(sender, instance, **kwargs):
+    refresh_tag_counts(getattr(instance, '_deleted_tag_ids', []))
+
+
+# model -> [(file field, processor)]; processors run in the background on upload
+FILE_PROCESSORS = {model: [(fields[0], process_image)] for model, fields in IMAGE_FIELDS.items()}
+FILE_PROCESSORS[Volume].append(('audio_file', process_audio))
+
+
+@receiver(post_init)
+def remember_file_names(sender, instance, **kwargs):
+    if sender in FILE_PROCESSORS:
+        # Deferred fields must not trigger a query from post_init
+        instance._original_files = {
+            field: getattr(instance, field).name
+            for field, _ in FILE_PROCESSORS[sender]
+            if field in instance.__dict__
+        }
+
+
+@receiver(post_save)
+def schedule_file_processing(sender, instance, created, raw=False, **kwargs):
+    if sender not in FILE_PROCESSORS or raw:
+        return
+    original = getattr(instance, '_original_files', {})
+    for field, processor in FILE_PROCESSORS[sender]:
+        if field not in instance.__dict__:
+            continue
+        name = getattr(instance, field).name
+        if name != original.get(field) and (name or not created):
+            run_in_background(processor, sender, instance.pk)
+        original[field] = name
+    instance._original_files = original
+
+
+COUNTED_MODELS = [model for model, _ in MODERATED_MODELS.values()]
+
+
+# model -> (event topic, the status that makes a row publicly visible)
+EVENT_TOPICS = {
+    BlogPost: ('blog', 'published'),
+    Volume: ('volumes', 'published'),
+    Testimonial: ('testimonials', 'published'),
+    PrayerTestimonial: ('prayer-testimonials', 'published'),
+    Book: ('books', 'published'),
+    Comment: ('comments', 'approved'),
+}
+
+
+@receiver(post_init)
+def remember_status(sender, instance, **kwargs):
+    if (sender in COUNTED_MODELS or sender in EVENT_TOPICS) and 'status' in instance.__dict__:
+        instance._original_status = instance.status
+    if sender is Comment and 'post_id' in instance.__dict__:
+        instance._original_post_id = instance.post_id
+
+
+@receiver(post_save)
+def count_status_change(sender, instance, created, raw=False, **kwargs):
+    if sender not in COUNTED_MODELS or raw or 'status' not in instance.__dict__:
+        return
+    previous = None if created else getattr(instance, '_original_status', None)
+    if previous is None and not created:
+        recount(sender)
+    elif previous != instance.status:
+        deltas = {instance.status: 1}
+        if previous is not None:
+            deltas[previous] = -1
+        adjust_counts(sender, deltas)
+    if sender is Comment:
+        update_approved_comment_count(instance, created, previous)
+
+
+def update_approved_comment_count(comment, created, previous_status):
+    previous_post = None if created else getattr(comment, '_original_post_id', None)
+    # The previous status is unknown if it was deferred when the row was loaded
+    unknown = previous_status is None and not created
+    changed = (comment.status == 'approved') != (previous_status == 'approved')
+    moved = not created and previous_post != comment.post_id and comment.status == 'approved'
+    # Any edit to an approved comment can change the post's comment preview,
+    # so the post's updated_at (and with it the ETag) is bumped as well
+    if unknown or changed or moved or comment.status == 'approved':
+        refresh_comment_counts({comment.post_id, previous_post} - {None})
+    comment._original_post_id = comment.post_id
+
+
+@receiver(post_delete)
+def count_status_delete(sender, instance, **kwargs):
+    if sender in COUNTED_MODELS:
+        status = getattr(instance, '_original_status', instance.status)
+        adjust_counts(sender, {status: -1})
+        if sender is Comment and status == 'approved':
+            refresh_comment_counts([instance.post_id])
+
+
+def touches_visible(sender, instance, created):
+    """True if the saved row is publicly visible now or was before this save."""
+    _, visible = EVENT_TOPICS[sender]
+    previous = None if created else getattr(instance, '_original_status', None)
+    return instance.status == visible or previous == visible or (previous is None and not created)
+
+
+def comment_extra(instance):
+    return {'posts': [instance.post_id]} if isinstance(instance, Comment) else {}
+
+
+@receiver(post_save)
+def publish_content_change(sender, instance, created, raw=False, **kwargs):
+    if sender not in EVENT_TOPICS or raw or 'status' not in instance.__dict__:
+        return
+    topic, visible = EVENT_TOPICS[sender]
+    if touches_visible(sender, instance, created):
+        action = 'changed' if instance.status == visible else 'removed'
+        extra = comment_extra(instance)
+        transaction.on_commit(lambda: publish(topic, action, [instance.pk], **extra))
+
+
+@receiver(post_delete)
+def publish_content_delete(sender, instance, **kwargs):
+    if sender in EVENT_TOPICS:
+        topic, visible = EVENT_TOPICS[sender]
+        if getattr(instance, '_original_status', instance.status) == visible:
+            pk, extra = instance.pk, comment_extra(instance)
+            transaction.on_commit(lambda: publish(topic, 'removed', [pk], **extra))
+
+
+SNAPSHOT_MODELS = [BlogPost, Volume]
+
+
+@receiver(post_save)
+def refresh_snapshots(sender, instance, created, raw=False, **kwargs):
+    if sender not in SNAPSHOT_MODELS or raw or not settings.SNAPSHOT_ROOT or 'status' not in instance.__dict__:
+        return
+    if touches_visible(sender, instance, created):
+        run_in_background(export_changed, sender, [instance.pk])
+
+
+@receiver(post_delete)
+def remove_snapshots(sender, instance, **kwargs):
+    if sender in SNAPSHOT_MODELS and settings.SNAPSHOT_ROOT:
+        if getattr(instance, '_original_status', instance.status) == 'published':
+            run_in_background(export_changed, sender, [instance.pk])
+
+
+# Must stay the last post_save receiver: the handlers above compare against it
+@receiver(post_save)
+def reset_original_status(sender, instance, **kwargs):
+    if hasattr(instance, '_original_status') and 'status' in instance.__dict__:
+        instance._original_status = instance.status
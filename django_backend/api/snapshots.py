@@ -0,0 +1,242 @@
+"""
+Static snapshots of published blog posts and volumes under SNAPSHOT_ROOT,
+for nginx to serve to anonymous clients without reaching Django.
+
+Layout (URL -> file):
+
+    /api/blog/            api/blog/index.json
+    /api/blog/?page=N     api/blog/page-N.json
+    /api/blog/<id>/       api/blog/<id>/index.json
+    /blog                 blog/index.html
+    /blog/<id>            blog/<id>/index.html
+
+and the same for volumes, except that the frontend has no volume detail
+page. JSON is rendered by the API views themselves, so a snapshot is
+byte-for-byte what Django would have served. HTML is the frontend's
+index.html with the content prerendered into the root element.
+
+manifest.json records a hash per file, so unchanged files are never
+rewritten. Every write is a temporary file in the same directory that
+is renamed into place, so nginx never sees a partial file.
+"""
+import fcntl
+import hashlib
+import io
+import json
+import math
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.utils.html import escape, format_html, format_html_join
+from django.utils.safestring import mark_safe
+from rest_framework.settings import api_settings
+
+from .models import BlogPost, Volume
+
+MANIFEST_NAME = 'manifest.json'
+TITLE_RE = re.compile(r'<title>.*?</title>', re.S)
+DESCRIPTION_RE = re.compile(r'<meta name="description" content="[^"]*"\s*/?>')
+ROOT_ELEMENT = '<div id="root"></div>'
+
+
+def render_post(post):
+    # Post content is staff-authored HTML, which the SPA also renders unescaped
+    return format_html(
+        '<article><h1>{}</h1><p>{} &middot; <time datetime="{}">{}</time></p>{}</article>',
+        post['title'], post.get('author_name') or '', post['created_at'], post['created_at'][:10],
+        mark_safe(post['content']),
+    )
+
+
+def render_list(items, key):
+    return format_html(
+        '<ul>{}</ul>',
+        format_html_join(
+            '', '<li><a href="/{}/{}">{}</a><p>{}</p></li>',
+            ((key, item['id'], item['title'], item.get('excerpt') or item.get('description') or '') for item in items),
+        ),
+    )
+
+
+# model -> (URL segment, viewset, page title, detail renderer or None, list renderer)
+def snapshot_sections():
+    from .views import BlogPostViewSet, VolumeViewSet
+
+    return {
+        BlogPost: ('blog', BlogPostViewSet, "Blog - Abba's Whispers", render_post, render_list),
+        Volume: ('volumes', VolumeViewSet, "Volumes - Abba's Whispers", None, render_list),
+    }
+
+
+def api_request(path, page=None):
+    """An anonymous JSON GET for `path`, addressed to SNAPSHOT_BASE_URL."""
+    base = urlsplit(settings.SNAPSHOT_BASE_URL)
+    secure = base.scheme == 'https'
+    return WSGIRequest({
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': urlencode({'page': page}) if page else '',
+        'HTTP_HOST': base.netloc,
+        'HTTP_ACCEPT': 'application/json',
+        'SERVER_NAME': base.hostname,
+        'SERVER_PORT': str(base.port or (443 if secure else 80)),
+        'wsgi.url_scheme': base.scheme,
+        'wsgi.input': io.BytesIO(),
+    })
+
+
+def render_api(view, path, page=None, **kwargs):
+    """Return (body, data) for a 200 response from `view`, or (None, None)."""
+    response = view(api_request(path, page), **kwargs)
+    if response.status_code != 200:
+        return None, None
+    response.render()
+    return response.content, response.data
+
+
+def html_shell():
+    """The built frontend's index.html, or None if the frontend hasn't been built."""
+    try:
+        return get_template('index.html').render()
+    except TemplateDoesNotExist:
+        return None
+
+
+def render_page(shell, title, description, body):
+    html = TITLE_RE.sub(lambda match: f'<title>{escape(title)}</title>', shell, count=1)
+    if description:
+        html = DESCRIPTION_RE.sub(
+            lambda match: f'<meta name="description" content="{escape(description)}" />', html, count=1,
+        )
+    return html.replace(ROOT_ELEMENT, f'<div id="root">{body}</div>', 1)
+
+
+@contextmanager
+def locked_root(root):
+    """Serialise exports across threads and processes sharing SNAPSHOT_ROOT."""
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def write_atomic(path, content):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.chmod(temp_path, 0o644)  # mkstemp creates 0600; nginx must be able to read it
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class SnapshotWriter:
+    """Writes files under `root`, skipping any whose content hash is unchanged."""
+
+    def __init__(self, root, force=False):
+        self.root = root
+        self.force = force
+        self.written = self.unchanged = self.removed = 0
+        try:
+            with open(os.path.join(root, MANIFEST_NAME)) as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+
+    def write(self, name, content):
+        if isinstance(content, str):
+            content = content.encode()
+        digest = hashlib.sha256(content).hexdigest()
+        path = os.path.join(self.root, name)
+        if not self.force and self.manifest.get(name) == digest and os.path.exists(path):
+            self.unchanged += 1
+            return
+        write_atomic(path, content)
+        self.manifest[name] = digest
+        self.written += 1
+
+    def remove(self, name):
+        self.manifest.pop(name, None)
+        try:
+            os.unlink(os.path.join(self.root, name))
+        except FileNotFoundError:
+            return
+        self.removed += 1
+
+    def names(self, pattern):
+        return [(name, match) for name in list(self.manifest) if (match := re.fullmatch(pattern, name))]
+
+    def save(self):
+        content = json.dumps(self.manifest, indent=1, sort_keys=True).encode()
+        write_atomic(os.path.join(self.root, MANIFEST_NAME), content)
+
+
+def export_lists(writer, key, viewset, title, render, shell):
+    view = viewset.as_view({'get': 'list'})
+    content, data = render_api(view, f'/api/{key}/')
+    writer.write(f'api/{key}/index.json', content)
+    pages = max(1, math.ceil(data['count'] / api_settings.PAGE_SIZE))
+    for page in range(2, pages + 1):
+        writer.write(f'api/{key}/page-{page}.json', render_api(view, f'/api/{key}/', page)[0])
+    for name, match in writer.names(rf'api/{re.escape(key)}/page-(\d+)\.json'):
+        if int(match[1]) > pages:
+            writer.remove(name)
+    if shell is not None:
+        writer.write(f'{key}/index.html', render_page(shell, title, None, render(data['results'], key)))
+
+
+def export_details(writer, key, viewset, render, shell, pks):
+    view = viewset.as_view({'get': 'retrieve'})
+    for pk in pks:
+        content, data = render_api(view, f'/api/{key}/{pk}/', pk=pk)
+        if content is None:
+            writer.remove(f'api/{key}/{pk}/index.json')
+            writer.remove(f'{key}/{pk}/index.html')
+            continue
+        writer.write(f'api/{key}/{pk}/index.json', content)
+        if shell is not None and render is not None:
+            body = render(data)
+            writer.write(f'{key}/{pk}/index.html', render_page(shell, data['title'], data.get('excerpt') or '', body))
+
+
+def export_snapshots(force=False):
+    """Full export: every list page and published item, dropping snapshots of anything no longer published."""
+    shell = html_shell()
+    with locked_root(settings.SNAPSHOT_ROOT):
+        writer = SnapshotWriter(settings.SNAPSHOT_ROOT, force=force)
+        for model, (key, viewset, title, render_detail, render_lists) in snapshot_sections().items():
+            export_lists(writer, key, viewset, title, render_lists, shell)
+            pks = set(model.objects.filter(status='published').values_list('pk', flat=True))
+            export_details(writer, key, viewset, render_detail, shell, sorted(pks))
+            for pattern in (rf'api/{re.escape(key)}/(\d+)/index\.json', rf'{re.escape(key)}/(\d+)/index\.html'):
+                for name, match in writer.names(pattern):
+                    if int(match[1]) not in pks:
+                        writer.remove(name)
+        writer.save()
+    return writer, shell is not None
+
+
+def export_changed(model, pks):
+    """Incremental export after `pks` of `model` were saved or deleted."""
+    key, viewset, title, render_detail, render_lists = snapshot_sections()[model]
+    shell = html_shell()
+    with locked_root(settings.SNAPSHOT_ROOT):
+        writer = SnapshotWriter(settings.SNAPSHOT_ROOT)
+        export_lists(writer, key, viewset, title, render_lists, shell)
+        export_details(writer, key, viewset, render_detail, shell, pks)
+        writer.save()
+    return writer
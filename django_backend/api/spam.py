@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.response import Response
+
+from .bloom import RotatingBloomFilter
+from .utils import client_fingerprint, get_client_ip
+
+logger = logging.getLogger(__name__)
+
+URL_RE = re.compile(r'https?://|www\.', re.IGNORECASE)
+MARKUP_LINK_RE = re.compile(r'<a\s|\[url', re.IGNORECASE)
+REPEAT_RE = re.compile(r'(.)\1{9,}')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+class TokenBuckets:
+    """
+    Token buckets keyed by client, held in process memory.
+
+    Each key may burst up to `capacity` submissions and then earns one new
+    token every 60 / `per_minute` seconds. At most `max_keys` buckets are
+    kept; the least recently used are dropped (i.e. reset to full).
+    """
+
+    def __init__(self, capacity, per_minute, max_keys=100000):
+        self.capacity = capacity
+        self.rate = per_minute / 60
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> (tokens, last refill)
+
+    def take(self, key):
+        """Spend a token for `key`; return 0 if allowed, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                wait = 0
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+def spam_score(text):
+    """
+    Cheap heuristic score; higher is spammier. Links dominate: a single link
+    in a long reflection is fine, several links or markup links are not.
+    """
+    words = max(1, len(text.split()))
+    links = len(URL_RE.findall(text))
+    score = 2 * links
+    score += 3 * len(MARKUP_LINK_RE.findall(text))
+    if links and words / links < 15:
+        score += 3
+    if REPEAT_RE.search(text):
+        score += 2
+    letters = [c for c in text if c.isalpha()]
+    if len(letters) > 20 and sum(c.isupper() for c in letters) / len(letters) > 0.7:
+        score += 2
+    return score
+
+
+def content_digest(kind, text):
+    normalized = WHITESPACE_RE.sub(' ', text).strip().lower()
+    return hashlib.blake2b(f'{kind}|{normalized}'.encode(), digest_size=16).hexdigest()
+
+
+ip_buckets = TokenBuckets(*settings.SPAM_IP_BUCKET)
+fingerprint_buckets = TokenBuckets(*settings.SPAM_FINGERPRINT_BUCKET)
+recent_submissions = RotatingBloomFilter(settings.SPAM_DUPLICATE_WINDOW, settings.SPAM_DUPLICATE_CAPACITY)
+
+
+def submission_text(request, fields):
+    return '\n'.join(str(request.data.get(field) or '') for field in fields)
+
+
+def record_submission(request, kind, fields):
+    """Remember a saved submission so an identical resend is rejected as a duplicate."""
+    text = submission_text(request, fields)
+    if text.strip():
+        recent_submissions.add(content_digest(kind, text))
+
+
+def check_submission(request, kind, fields):
+    """
+    Screen an anonymous form submission before anything touches the database.
+    Returns None to accept it, or a Response to send back instead.
+    """
+    ip = get_client_ip(request)
+    wait = max(
+        ip_buckets.take(f'{kind}:{ip}'),
+        fingerprint_buckets.take(f'{kind}:{client_fingerprint(request)}'),
+    )
+    if wait:
+        logger.info('Rate limited %s submission from %s', kind, ip)
+        response = Response(
+            {'error': 'Too many submissions. Please wait a moment and try again.'},
+            status=status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+        response['Retry-After'] = str(int(wait) + 1)
+        return response
+
+    text = submission_text(request, fields)
+    if spam_score(text) >= settings.SPAM_SCORE_THRESHOLD:
+        logger.info('Rejected %s submission from %s as spam', kind, ip)
+        return Response(
+            {'error': 'Your message looks like spam. Please remove links and try again.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # Only saved submissions are recorded, so a rejected one can be corrected and resent
+    if text.strip() and content_digest(kind, text) in recent_submissions:
+        logger.info('Rejected duplicate %s submission from %s', kind, ip)
+        return Response(
+            {'error': 'We have already received this message. Thank you!'},
+            status=status.HTTP_409_CONFLICT,
+        )
+    return None
+
+
+class SpamFilterMixin:
+    """
+    Runs `check_submission` on create, before validation or any query, and
+    records the submission once it has been saved.
+    """
+    spam_kind = None
+    spam_fields = ()
+
+    def create(self, request, *args, **kwargs):
+        rejection = check_submission(request, self.spam_kind, self.spam_fields)
+        if rejection is not None:
+            return rejection
+        response = super().create(request, *args, **kwargs)
+        if response.status_code == status.HTTP_201_CREATED:
+            record_submission(request, self.spam_kind, self.spam_fields)
+        return response
@@ -0,0 +1,115 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+class RangeFile:
+    """File wrapper that yields at most `length` bytes starting at `start`."""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=CHUNK_SIZE):
+        if self.remaining <= 0:
+            return b''
+        data = self.file.read(min(size, self.remaining))
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) for a single satisfiable byte range, None when the
+    header should be ignored (absent, malformed or multi-range), or False
+    when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def file_validators(path):
+    stat = os.stat(path)
+    return stat.st_size, quote_etag(f'{stat.st_size:x}-{int(stat.st_mtime):x}'), int(stat.st_mtime)
+
+
+def stream_file(request, path, name, accel_prefix=''):
+    """
+    Serve a stored file with ETag/Last-Modified validators and single-range
+    (206) support. Returns (response, start_byte) so callers can tell a new
+    playback from a seek; start_byte is None when no body is sent.
+    """
+    size, etag, mtime = file_validators(path)
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=mtime)
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        return not_modified, None
+
+    if accel_prefix:
+        # nginx serves the bytes (and handles Range itself) from an internal location
+        response = HttpResponse(content_type=content_type)
+        # nginx unquotes the URI; an unquoted non-ASCII name would be MIME-encoded by Django
+        response['X-Accel-Redirect'] = quote(accel_prefix + name)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(mtime)
+        return response, parse_start(request.headers.get('Range'), size)
+
+    byte_range = parse_range(request.headers.get('Range'), size)
+    if_range = request.headers.get('If-Range')
+    if byte_range and if_range and if_range != etag:
+        byte_range = None
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response, None
+
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+        start = 0
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = FileResponse(RangeFile(open(path, 'rb'), start, length), status=206, content_type=content_type)
+        response['Content-Length'] = str(length)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(mtime)
+    return response, start
+
+
+def parse_start(header, size):
+    byte_range = parse_range(header, size)
+    if byte_range is None:
+        return 0
+    return byte_range[0] if byte_range else None
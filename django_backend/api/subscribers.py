@@ -0,0 +1,152 @@
+import csv
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import connection
+from django.utils import timezone
+
+from .models import Subscriber
+
+EXPORT_FIELDS = ['email', 'name', 'status', 'subscribed_at']
+STATUSES = {value for value, _ in Subscriber.STATUS_CHOICES}
+
+
+def normalize_email(value):
+    """Lower-cased, trimmed address, or None if it isn't a valid email."""
+    email = (value or '').strip().lower()
+    try:
+        validate_email(email)
+    except ValidationError:
+        return None
+    return email
+
+
+def subscribe(email, name=''):
+    """
+    Subscribe `email` with a single INSERT ... ON CONFLICT statement.
+
+    A new address is inserted; an `unsubscribed` row is reactivated; an
+    active (or bounced) row is left alone. Concurrent calls for the same
+    address cannot race each other into a unique-constraint error.
+    Returns 'created', 'reactivated' or 'existing'.
+    """
+    table = connection.ops.quote_name(Subscriber._meta.db_table)
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (email, name, status, subscribed_at, updated_at)
+            VALUES (%s, %s, 'active', %s, %s)
+            ON CONFLICT (email) DO UPDATE SET
+                status = 'active',
+                name = CASE WHEN EXCLUDED.name = '' THEN {table}.name ELSE EXCLUDED.name END,
+                updated_at = EXCLUDED.updated_at
+            WHERE {table}.status = 'unsubscribed'
+            RETURNING subscribed_at = %s
+            """,
+            [email, name, now, now, now],
+        )
+        row = cursor.fetchone()
+    if row is None:
+        return 'existing'
+    return 'created' if row[0] else 'reactivated'
+
+
+def read_rows(lines):
+    """
+    Yield (line number, email, name, status) from CSV text lines.
+
+    The email column is found by header name, falling back to the first
+    column for header-less files. Rows are parsed one at a time.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = {name.strip().lower(): i for i, name in enumerate(header)}
+    email_col = columns.get('email')
+    if email_col is None:
+        email_col = 0
+        reader = _prepend(header, reader)
+    name_col, status_col = columns.get('name'), columns.get('status')
+
+    for row in reader:
+        if not row:
+            continue
+        yield (
+            reader.line_num,
+            row[email_col] if email_col < len(row) else '',
+            row[name_col].strip()[:100] if name_col is not None and name_col < len(row) else '',
+            row[status_col].strip().lower() if status_col is not None and status_col < len(row) else '',
+        )
+
+
+def _prepend(first, rows):
+    yield first
+    yield from rows
+
+
+def insert_new(subscribers):
+    """
+    INSERT (email, name, status) rows in one statement, skipping addresses
+    that already exist. Returns the number of rows actually inserted.
+    """
+    if not subscribers:
+        return 0
+    table = connection.ops.quote_name(Subscriber._meta.db_table)
+    now = timezone.now()
+    values = ', '.join(['(%s, %s, %s, %s, %s)'] * len(subscribers))
+    params = [value for email, name, status in subscribers for value in (email, name, status, now, now)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (email, name, status, subscribed_at, updated_at)
+            VALUES {values}
+            ON CONFLICT DO NOTHING
+            RETURNING id
+            """,
+            params,
+        )
+        return len(cursor.fetchall())
+
+
+def import_subscribers(lines, batch_size=1000):
+    """
+    Stream a CSV into Subscriber with one INSERT ... ON CONFLICT DO NOTHING
+    per batch, so memory is bounded by `batch_size` rather than by the size
+    of the file. Rows the database skips are counted as existing.
+    """
+    stats = {'rows': 0, 'created': 0, 'existing': 0, 'duplicates': 0, 'invalid': 0}
+    rows = read_rows(lines)
+    while chunk := list(islice(rows, batch_size)):
+        batch = {}
+        for _, raw_email, name, status in chunk:
+            stats['rows'] += 1
+            email = normalize_email(raw_email)
+            if email is None:
+                stats['invalid'] += 1
+            elif email in batch:
+                stats['duplicates'] += 1
+            else:
+                batch[email] = (email, name, status if status in STATUSES else 'active')
+
+        created = insert_new(list(batch.values()))
+        stats['created'] += created
+        stats['existing'] += len(batch) - created
+    return stats
+
+
+class Echo:
+    """Pseudo-buffer for csv.writer that hands each row straight back."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=2000):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    rows = queryset.order_by('pk').values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    for email, name, status, subscribed_at in rows:
+        yield writer.writerow([email, name, status, subscribed_at.isoformat()])
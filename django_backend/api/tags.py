@@ -0,0 +1,48 @@
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.text import slugify
+
+from .models import BlogPostTag, Tag
+
+
+def parse_tags(text):
+    """Split a comma-separated tag string into {slug: name}, keeping the first spelling."""
+    tags = {}
+    for name in (text or '').split(','):
+        name = name.strip().lstrip('#').strip()
+        slug = slugify(name)[:100]
+        if slug and slug not in tags:
+            tags[slug] = name[:100]
+    return tags
+
+
+def refresh_tag_counts(tag_ids):
+    """Recount published posts for the given tags only, via the (tag, post) index."""
+    if not tag_ids:
+        return
+    published_links = BlogPostTag.objects.filter(
+        tag=OuterRef('pk'), post__status='published',
+    ).order_by().values('tag').annotate(total=Count('pk')).values('total')
+    Tag.objects.filter(pk__in=tag_ids).update(post_count=Coalesce(Subquery(published_links), 0))
+
+
+def sync_post_tags(post):
+    """Mirror `post.tags` into the tag tables and update the affected counts."""
+    wanted = parse_tags(post.tags)
+    current = dict(BlogPostTag.objects.filter(post=post).values_list('tag__slug', 'tag_id'))
+
+    Tag.objects.bulk_create(
+        [Tag(name=name, slug=slug) for slug, name in wanted.items() if slug not in current],
+        ignore_conflicts=True,
+    )
+    tag_ids = dict(Tag.objects.filter(slug__in=wanted).values_list('slug', 'pk'))
+
+    removed = [tag_id for slug, tag_id in current.items() if slug not in wanted]
+    if removed:
+        BlogPostTag.objects.filter(post=post, tag_id__in=removed).delete()
+    BlogPostTag.objects.bulk_create(
+        [BlogPostTag(post=post, tag_id=tag_ids[slug]) for slug in wanted if slug not in current],
+        ignore_conflicts=True,
+    )
+    # The post's status may have changed too, so every tag it touches is recounted
+    refresh_tag_counts(set(removed) | set(tag_ids.values()))
@@ -1,7 +1,8 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'blog', views.BlogPostViewSet)
@@ -12,17 +13,42 @@ router.register(r'subscribers', views.SubscriberViewSet)
 router.register(r'comments', views.CommentViewSet)
 router.register(r'testimonials', views.TestimonialViewSet)
 router.register(r'prayer-testimonials', views.PrayerTestimonialViewSet)
+router.register(r'books', views.BookViewSet)
 
 urlpatterns = [
     # Specific URLs first (before router patterns)
     path('auth/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('health/', views.health_check, name='health_check'),
+    path('home/', views.home, name='home'),
+    path('search/', views.search_content, name='search'),
     path('subscribers/subscribe/', views.subscribe_newsletter, name='subscribe_newsletter'),
+    path('blog/tags/', views.blog_tags, name='blog_tags'),
     path('blog/<int:pk>/comments/', views.get_post_comments, name='post_comments'),
+    path('blog/<int:pk>/view/', views.track_view, name='track_view'),
     path('comments/create/', views.create_comment, name='create_comment'),
     path('volumes/<int:pk>/download/', views.track_download, name='track_download'),
+    path('volumes/<int:pk>/stream/', views.stream_volume_audio, name='volume_stream'),
     path('debug/posts/', views.debug_posts, name='debug_posts'),
+    path('moderation/counts/', views.moderation_counts, name='moderation_counts'),
+    path('moderation/<str:queue>/', views.moderation_queue, name='moderation_queue'),
+    path('moderation/<str:queue>/bulk/', views.moderation_bulk, name='moderation_bulk'),
+]
+
+if settings.ASYNC_API:
+    # Matched ahead of the sync views and the router; other methods are delegated back to them
+    urlpatterns = [
+        path('health/', async_views.health_check, name='health_check'),
+        path('blog/', async_views.blog_list),
+        path('blog/<int:pk>/', async_views.blog_detail),
+        path('blog/<int:pk>/comments/', async_views.get_post_comments, name='post_comments'),
+        path('volumes/', async_views.volume_list),
+        path('volumes/<int:pk>/', async_views.volume_detail),
+        path('testimonials/', async_views.testimonial_list),
+        path('testimonials/<int:pk>/', async_views.testimonial_detail),
+    ] + urlpatterns
+
+urlpatterns += [
     # Router patterns last
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -0,0 +1,16 @@
+import hashlib
+
+
+def get_client_ip(request):
+    # nginx's proxy_params sets X-Real-IP; gunicorn on a unix socket has no REMOTE_ADDR
+    return request.META.get('HTTP_X_REAL_IP') or request.META.get('REMOTE_ADDR', '')
+
+
+def ratelimit_ip(group, request):
+    """django-ratelimit key that also works behind nginx on a unix socket."""
+    return get_client_ip(request)
+
+
+def client_fingerprint(request):
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    return hashlib.blake2b(f'{get_client_ip(request)}|{user_agent}'.encode(), digest_size=12).hexdigest()
@@ -1,23 +1,60 @@
+import csv
+import io
+import os
 from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, AllowAny
 from rest_framework.response import Response
+from rest_framework.pagination import PageNumberPagination
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django_ratelimit.decorators import ratelimit
-from django.utils.decorators import method_decorator
 from django.contrib.auth import authenticate
 from django.views.decorators.csrf import csrf_exempt
-from django.http import JsonResponse
-from .models import BlogPost, Volume, PrayerRequest, ContactMessage, Subscriber, Comment, SiteSetting, Testimonial, PrayerTestimonial
+from django.http import JsonResponse, Http404, HttpResponseRedirect, StreamingHttpResponse
+from django.views.decorators.http import require_safe
+from django.core.files.storage import default_storage
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.db import transaction
+from django.utils.text import slugify
+from .models import BlogPost, Volume, PrayerRequest, ContactMessage, Subscriber, Comment, SiteSetting, Testimonial, PrayerTestimonial, Book, Tag
 from .serializers import (
-    BlogPostSerializer, VolumeSerializer, PrayerRequestSerializer,
+    BlogPostSerializer, BlogPostListSerializer, VolumeSerializer, VolumeListSerializer, PrayerRequestSerializer,
     ContactMessageSerializer, SubscriberSerializer, CommentSerializer, SiteSettingSerializer,
-    TestimonialSerializer, PrayerTestimonialSerializer
+    SubscribeSerializer, TestimonialSerializer, PrayerTestimonialSerializer, ModerationBulkSerializer,
+    BookSerializer, BookListSerializer
 )
+from .conditional import ConditionalResponseMixin, make_etag, set_validators
+from .cache import CachedResponseMixin, cached_response
+from .fieldsets import SparseFieldsetMixin
+from .counters import counters
+from .bloom import RotatingBloomFilter
+from .utils import client_fingerprint, ratelimit_ip
+from .spam import SpamFilterMixin, check_submission, record_submission
+from .search import search
+from .streaming import stream_file
+from .subscribers import export_rows, import_subscribers, subscribe
+from .moderation import MODERATED_MODELS, statuses, status_counts, transition
+from .pagination import KeysetPagination
+from .books import FeaturedBooks
+from .home import HOME_MODELS, home_fingerprints, home_payload, home_validators
+from .filters import BookFilter
+from .outbox import notify_comment, notify_contact_message, notify_prayer_request
 
-class BlogPostViewSet(viewsets.ModelViewSet):
-    queryset = BlogPost.objects.filter(status='published').order_by('-created_at')
+recent_post_views = RotatingBloomFilter(
+    window=settings.VIEW_DEDUPE_WINDOW,
+    capacity=settings.VIEW_DEDUPE_CAPACITY,
+)
+recent_plays = RotatingBloomFilter(
+    window=settings.VIEW_DEDUPE_WINDOW,
+    capacity=settings.VIEW_DEDUPE_CAPACITY,
+)
+
+class BlogPostViewSet(ConditionalResponseMixin, CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = BlogPost.objects.filter(status='published').select_related('author').order_by('-created_at')
     serializer_class = BlogPostSerializer
+    list_serializer_class = BlogPostListSerializer
     permission_classes = [AllowAny]
     
     def get_permissions(self):
@@ -25,101 +62,157 @@ class BlogPostViewSet(viewsets.ModelViewSet):
             return [IsAuthenticated()]
         return [AllowAny()]
     
-    def list(self, request, *args, **kwargs):
-        print(f"BlogPost API called - Found {self.get_queryset().count()} posts")
-        return super().list(request, *args, **kwargs)
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        tag = self.request.query_params.get('tag')
+        if tag:
+            queryset = queryset.filter(tag_links__tag__slug=slugify(tag))
+        return queryset
 
-class VolumeViewSet(viewsets.ModelViewSet):
+class VolumeViewSet(ConditionalResponseMixin, CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Volume.objects.filter(status='published').order_by('-created_at')
     serializer_class = VolumeSerializer
+    list_serializer_class = VolumeListSerializer
     permission_classes = [AllowAny]
     
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
             return [IsAuthenticated()]
         return [AllowAny()]
+
+class BookViewSet(ConditionalResponseMixin, CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = Book.objects.filter(status='published').order_by('-featured', '-created_at', '-id')
+    serializer_class = BookSerializer
+    list_serializer_class = BookListSerializer
+    filterset_class = BookFilter
+    keyset_ordering = ('-featured', '-created_at', '-id')
+    permission_classes = [AllowAny]
+    
+    def get_permissions(self):
+        if self.action in ['create', 'update', 'partial_update', 'destroy']:
+            return [IsAdminUser()]
+        return [AllowAny()]
     
-    def list(self, request, *args, **kwargs):
-        print(f"Volume API called - Found {self.get_queryset().count()} volumes")
-        return super().list(request, *args, **kwargs)
+    @action(detail=False, methods=['get'])
+    def featured(self, request):
+        books, version = FeaturedBooks.get()
+        etag = make_etag('featured-books', version, request.get_full_path(), request.accepted_renderer.format)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, None)
+        serializer = BookListSerializer(books, many=True, context=self.get_serializer_context())
+        return set_validators(Response(serializer.data), etag, None)
 
-class PrayerRequestViewSet(viewsets.ModelViewSet):
+class PrayerRequestViewSet(SpamFilterMixin, viewsets.ModelViewSet):
     queryset = PrayerRequest.objects.all()
     serializer_class = PrayerRequestSerializer
+    spam_kind = 'prayer'
+    spam_fields = ('name', 'email', 'request')
     
     def get_permissions(self):
         if self.action == 'create':
             return [AllowAny()]
         return [IsAuthenticated()]
+    
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            notify_prayer_request(serializer.save())
 
-class ContactMessageViewSet(viewsets.ModelViewSet):
+class ContactMessageViewSet(SpamFilterMixin, viewsets.ModelViewSet):
     queryset = ContactMessage.objects.all()
     serializer_class = ContactMessageSerializer
+    spam_kind = 'contact'
+    spam_fields = ('name', 'email', 'subject', 'message')
     
     def get_permissions(self):
         if self.action == 'create':
             return [AllowAny()]
         return [IsAuthenticated()]
+    
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            notify_contact_message(serializer.save())
+
+SUBSCRIBE_RESPONSES = {
+    'created': ('Successfully subscribed!', status.HTTP_201_CREATED),
+    'reactivated': ('Welcome back! Your subscription has been reactivated.', status.HTTP_200_OK),
+    'existing': ('You are already subscribed!', status.HTTP_200_OK),
+}
+
+def subscribe_response(request):
+    serializer = SubscribeSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    result = subscribe(**serializer.validated_data)
+    message, code = SUBSCRIBE_RESPONSES[result]
+    return Response({'message': message, 'status': result, 'email': serializer.validated_data['email']}, status=code)
 
 class SubscriberViewSet(viewsets.ModelViewSet):
     queryset = Subscriber.objects.all()
     serializer_class = SubscriberSerializer
+    keyset_ordering = ('-subscribed_at', '-id')
     
     def get_permissions(self):
         if self.action == 'create':
             return [AllowAny()]
+        if self.action in ('import_csv', 'export_csv'):
+            return [IsAdminUser()]
         return [IsAuthenticated()]
     
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_csv(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Upload a CSV file in the "file" field'}, status=status.HTTP_400_BAD_REQUEST)
+        lines = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        try:
+            stats = import_subscribers(lines)
+        except (UnicodeDecodeError, csv.Error) as e:
+            return Response({'error': f'Could not read CSV: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(stats)
+    
+    @action(detail=False, methods=['get'], url_path='export')
+    def export_csv(self, request):
+        queryset = Subscriber.objects.all()
+        if request.query_params.get('status'):
+            queryset = queryset.filter(status=request.query_params['status'])
+        response = StreamingHttpResponse(export_rows(queryset), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="subscribers.csv"'
+        return response
+    
     def create(self, request, *args, **kwargs):
-        email = request.data.get('email')
-        if not email:
-            return Response({'error': 'Email is required'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Check if email already exists
-        if Subscriber.objects.filter(email=email).exists():
-            return Response({'message': 'You are already subscribed!'}, status=status.HTTP_200_OK)
-        
-        return super().create(request, *args, **kwargs)
-
-class CommentViewSet(viewsets.ModelViewSet):
+        return subscribe_response(request)
+
+class CommentViewSet(SpamFilterMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    spam_kind = 'comment'
+    spam_fields = ('author_name', 'author_email', 'content')
     
     def get_permissions(self):
         if self.action == 'create':
             return [AllowAny()]
         return [IsAuthenticated()]
     
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            notify_comment(serializer.save())
+    
     def create(self, request, *args, **kwargs):
-        # Ensure required fields are present
-        required_fields = ['post', 'author_name', 'content']
-        for field in required_fields:
-            if field not in request.data or not request.data[field]:
-                return Response(
-                    {'error': f'{field} is required'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        
-        # Validate that the blog post exists
-        try:
-            BlogPost.objects.get(id=request.data['post'])
-        except BlogPost.DoesNotExist:
-            return Response(
-                {'error': 'Blog post not found'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
+        # SpamFilterMixin screens the request first; CommentSerializer then
+        # rejects missing fields and unknown posts
         response = super().create(request, *args, **kwargs)
-        if response.status_code == 201:
+        if response.status_code == status.HTTP_201_CREATED:
             return Response({
                 'message': 'We have successfully received your reflection. Thank you for sharing your thoughts with our community.',
                 'data': response.data
             }, status=status.HTTP_201_CREATED)
         return response
 
-class TestimonialViewSet(viewsets.ModelViewSet):
+class TestimonialViewSet(ConditionalResponseMixin, CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Testimonial.objects.filter(status='published').order_by('order', '-created_at')
     serializer_class = TestimonialSerializer
+    keyset_ordering = ('order', '-created_at', '-id')
     permission_classes = [AllowAny]
     
     def get_permissions(self):
@@ -127,9 +220,10 @@ class TestimonialViewSet(viewsets.ModelViewSet):
             return [IsAuthenticated()]
         return [AllowAny()]
 
-class PrayerTestimonialViewSet(viewsets.ModelViewSet):
+class PrayerTestimonialViewSet(ConditionalResponseMixin, CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = PrayerTestimonial.objects.filter(status='published').order_by('order', '-created_at')
     serializer_class = PrayerTestimonialSerializer
+    keyset_ordering = ('order', '-created_at', '-id')
     permission_classes = [AllowAny]
     
     def get_permissions(self):
@@ -144,6 +238,44 @@ class PrayerTestimonialViewSet(viewsets.ModelViewSet):
 def health_check(request):
     return Response({'status': 'OK', 'message': 'Django API is running'})
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def home(request):
+    """First page of every published collection in one response, for the homepage."""
+    fingerprints = home_fingerprints()
+    etag, last_modified = home_validators(request, fingerprints)
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if not_modified is not None:
+        return set_validators(not_modified, etag, last_modified)
+    response = cached_response(
+        request, HOME_MODELS, lambda: Response(home_payload(request, fingerprints)), salt=etag,
+    )
+    return set_validators(response, etag, last_modified)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def blog_tags(request):
+    def tags_response():
+        tags = Tag.objects.filter(post_count__gt=0).values('name', 'slug', 'post_count')
+        return Response(list(tags))
+    return cached_response(request, [BlogPost], tags_response)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def search_content(request):
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': 'Query parameter q is required'}, status=status.HTTP_400_BAD_REQUEST)
+    types = request.query_params.get('type')
+
+    def search_response():
+        paginator = PageNumberPagination()
+        page = paginator.paginate_queryset(search(query, types.split(',') if types else None), request)
+        return paginator.get_paginated_response(page)
+    return cached_response(request, [BlogPost, Volume, Book], search_response)
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def debug_posts(request):
@@ -158,40 +290,71 @@ def debug_posts(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
-@method_decorator(ratelimit(key='ip', rate='5/m', method='POST'))
+@ratelimit(key=ratelimit_ip, rate='5/m', method='POST')
 def subscribe_newsletter(request):
-    serializer = SubscriberSerializer(data=request.data)
-    if serializer.is_valid():
-        serializer.save()
-        return Response({'message': 'Successfully subscribed!'}, status=status.HTTP_201_CREATED)
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return subscribe_response(request)
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_post_comments(request, pk):
-    try:
-        comments = Comment.objects.filter(post_id=pk, status='approved')
-        serializer = CommentSerializer(comments, many=True)
-        return Response(serializer.data)
-    except Exception as e:
-        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    def comments_response():
+        try:
+            comments = Comment.objects.filter(post_id=pk, status='approved')
+            serializer = CommentSerializer(comments, many=True)
+            return Response(serializer.data)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return cached_response(request, [Comment], comments_response)
 
 @api_view(['PATCH'])
 @permission_classes([AllowAny])
 def track_download(request, pk):
-    try:
-        volume = Volume.objects.get(pk=pk)
-        volume.downloads += 1
-        volume.save()
-        return Response({'message': 'Download tracked', 'downloads': volume.downloads})
-    except Volume.DoesNotExist:
+    downloads = Volume.objects.filter(pk=pk).values_list('downloads', flat=True).first()
+    if downloads is None:
         return Response({'error': 'Volume not found'}, status=status.HTTP_404_NOT_FOUND)
+    counters.increment(Volume, 'downloads', pk)
+    return Response({
+        'message': 'Download tracked',
+        'downloads': downloads + counters.pending(Volume, 'downloads', pk),
+    })
+
+@require_safe
+def stream_volume_audio(request, pk):
+    name = Volume.objects.filter(pk=pk, status='published').values_list('audio_file', flat=True).first()
+    if not name:
+        raise Http404('Audio not found')
+    try:
+        path = default_storage.path(name)
+    except NotImplementedError:
+        # Remote storages serve their own ranges
+        return HttpResponseRedirect(default_storage.url(name))
+    if not os.path.exists(path):
+        raise Http404('Audio not found')
+
+    response, start = stream_file(request, path, name, settings.AUDIO_X_ACCEL_REDIRECT_PREFIX)
+    # Range requests for seeks don't count; a fresh playback from byte 0 counts once per client
+    if request.method == 'GET' and start == 0 and recent_plays.add(f'{pk}:{client_fingerprint(request)}'):
+        counters.increment(Volume, 'downloads', pk)
+    return response
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def track_view(request, pk):
+    # Unknown ids would otherwise fill the dedupe filter and the counter buffer
+    if not BlogPost.objects.filter(pk=pk, status='published').exists():
+        raise Http404('Post not found')
+    counted = recent_post_views.add(f'{pk}:{client_fingerprint(request)}')
+    if counted:
+        counters.increment(BlogPost, 'views', pk)
+    return Response({'counted': counted}, status=status.HTTP_202_ACCEPTED)
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def create_comment(request):
     """Debug endpoint for comment creation"""
-    print(f"Comment data received: {request.data}")
+    rejection = check_submission(request, CommentViewSet.spam_kind, CommentViewSet.spam_fields)
+    if rejection is not None:
+        return rejection
     
     # Check required fields
     required_fields = ['post', 'author_name', 'content']
@@ -214,10 +377,55 @@ def create_comment(request):
     
     serializer = CommentSerializer(data=request.data)
     if serializer.is_valid():
-        comment = serializer.save()
+        with transaction.atomic():
+            comment = serializer.save()
+            notify_comment(comment)
+        record_submission(request, CommentViewSet.spam_kind, CommentViewSet.spam_fields)
         return Response({
             'message': 'We have successfully received your reflection. Thank you for sharing your thoughts with our community.',
             'data': serializer.data
         }, status=status.HTTP_201_CREATED)
     
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+MODERATION_SERIALIZERS = {
+    'comments': CommentSerializer,
+    'prayers': PrayerRequestSerializer,
+}
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def moderation_counts(request):
+    """Per-status counts for the dashboard badges, read from the counter table."""
+    return Response(status_counts())
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def moderation_queue(request, queue):
+    if queue not in MODERATED_MODELS:
+        return Response({'error': 'Unknown moderation queue'}, status=status.HTTP_404_NOT_FOUND)
+    model, default_status = MODERATED_MODELS[queue]
+    status_filter = request.query_params.get('status', default_status)
+    if status_filter not in statuses(model):
+        return Response({'error': f'Invalid status: {status_filter}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    paginator = KeysetPagination(('-created_at', '-id'))
+    page = paginator.paginate_queryset(model.objects.filter(status=status_filter), request)
+    serializer = MODERATION_SERIALIZERS[queue](page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def moderation_bulk(request, queue):
+    """Move up to 1000 items to a new status in one UPDATE: {"ids": [...], "status": "approved"}."""
+    if queue not in MODERATED_MODELS:
+        return Response({'error': 'Unknown moderation queue'}, status=status.HTTP_404_NOT_FOUND)
+    model, _ = MODERATED_MODELS[queue]
+    serializer = ModerationBulkSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    new_status = serializer.validated_data['status']
+    if new_status not in statuses(model):
+        return Response({'error': f'Invalid status: {new_status}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    changed = transition(model, serializer.validated_data['ids'], new_status)
+    return Response({'updated': len(changed), 'counts': status_counts()[queue]})
@@ -1,24 +1,113 @@
 import { useEffect, useRef } from 'react';
+import { API_BASE_URL } from '../utils/api';
 
-export const useRealTimeData = (fetchFunction, dependencies = [], interval = 60000) => {
-  const intervalRef = useRef(null);
+// Topics sent by /api/events/; 'resync' means "refetch everything"
+const TOPICS = ['blog', 'volumes', 'testimonials', 'prayer-testimonials', 'books', 'comments', 'resync'];
+
+// One EventSource per tab, shared by every component that listens
+const subscribers = new Set();
+let source = null;
+let wasLive = false;
+
+const notify = (topic) => {
+  subscribers.forEach((subscriber) => {
+    if (topic === 'resync' || subscriber.topics.includes(topic)) {
+      subscriber.onChange();
+    }
+  });
+};
+
+const openSource = () => {
+  source = new EventSource(`${API_BASE_URL}/events/`);
+  source.onopen = () => {
+    subscribers.forEach((subscriber) => subscriber.onLiveChange(true));
+    // Anything published while we were disconnected was missed
+    if (wasLive) notify('resync');
+    wasLive = true;
+  };
+  source.onerror = () => {
+    subscribers.forEach((subscriber) => subscriber.onLiveChange(false));
+    if (source && source.readyState === EventSource.CLOSED) {
+      // The server doesn't offer the stream (e.g. a WSGI-only deployment); polling takes over
+      source = null;
+    }
+  };
+  TOPICS.forEach((topic) => source.addEventListener(topic, () => notify(topic)));
+};
+
+const subscribe = (subscriber) => {
+  subscribers.add(subscriber);
+  if (!source) {
+    openSource();
+  } else if (source.readyState === EventSource.OPEN) {
+    subscriber.onLiveChange(true);
+  }
+};
+
+const unsubscribe = (subscriber) => {
+  subscribers.delete(subscriber);
+  if (subscribers.size === 0 && source) {
+    source.close();
+    source = null;
+    wasLive = false;
+  }
+};
+
+/**
+ * Calls `fetchFunction` whenever the server announces a change to one of
+ * `topics`. Falls back to polling every `interval` ms while the event
+ * stream is unavailable, or always when no topics are given.
+ */
+export const useRealTimeData = (fetchFunction, dependencies = [], interval = 60000, topics = []) => {
+  const fetchRef = useRef(fetchFunction);
+  fetchRef.current = fetchFunction;
+  const topicKey = topics.join(',');
 
   useEffect(() => {
-    if (typeof fetchFunction === 'function' && interval > 0) {
-      intervalRef.current = setInterval(() => {
-        try {
-          fetchFunction();
-        } catch (error) {
-          console.error('Real-time data fetch error:', error);
-        }
-      }, interval);
+    if (typeof fetchFunction !== 'function') {
+      return undefined;
     }
 
-    return () => {
-      if (intervalRef.current) {
-        clearInterval(intervalRef.current);
-        intervalRef.current = null;
+    let timer = null;
+    let debounce = null;
+    const run = () => {
+      try {
+        fetchRef.current();
+      } catch (error) {
+        console.error('Real-time data fetch error:', error);
       }
     };
-  }, [fetchFunction, interval]);
-};
\ No newline at end of file
+    const startPolling = () => {
+      if (!timer && interval > 0) timer = setInterval(run, interval);
+    };
+    const stopPolling = () => {
+      if (timer) {
+        clearInterval(timer);
+        timer = null;
+      }
+    };
+
+    if (!topicKey || typeof EventSource === 'undefined') {
+      startPolling();
+      return stopPolling;
+    }
+
+    const subscriber = {
+      topics: topicKey.split(','),
+      // Coalesce bursts (e.g. a bulk moderation action) into one refetch
+      onChange: () => {
+        clearTimeout(debounce);
+        debounce = setTimeout(run, 500);
+      },
+      onLiveChange: (live) => (live ? stopPolling() : startPolling()),
+    };
+    startPolling();
+    subscribe(subscriber);
+
+    return () => {
+      unsubscribe(subscriber);
+      stopPolling();
+      clearTimeout(debounce);
+    };
+  }, [fetchFunction, interval, topicKey]);
+};
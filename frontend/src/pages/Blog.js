@@ -41,7 +41,7 @@ const Blog = () => {
     loadPosts();
   }, [loadPosts]);
 
-  useRealTimeData(loadPosts, [searchTerm, selectedCategory], 30000);
+  useRealTimeData(loadPosts, [searchTerm, selectedCategory], 30000, ['blog']);
 
   const categories = [
     { value: 'all', label: 'All Posts' },
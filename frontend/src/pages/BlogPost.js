@@ -17,6 +17,7 @@ const BlogPost = () => {
     try {
       const response = await blogAPI.getPost(id);
       setPost(response.data);
+      blogAPI.trackView(id).catch(() => {});
     } catch (error) {
       console.error('Error loading post:', error);
       setPost(null);
@@ -47,7 +47,18 @@ const Volumes = () => {
   }, [loadVolumes]);
 
   // Real-time updates every 30 seconds
-  useRealTimeData(loadVolumes, [selectedCategory], 30000);
+  useRealTimeData(loadVolumes, [selectedCategory], 30000, ['volumes']);
+
+  // The list endpoint omits the full text, so fetch it when the modal opens
+  const openVolume = async (volume) => {
+    setSelectedVolume(volume);
+    try {
+      const response = await volumeAPI.getVolume(volume.id);
+      setSelectedVolume((current) => (current && current.id === volume.id ? response.data : current));
+    } catch (error) {
+      console.error('Error loading volume:', error);
+    }
+  };
 
   const handleSignupChange = (e) => {
     setSignupForm({
@@ -466,7 +477,7 @@ const Volumes = () => {
                           marginTop: '2rem'
                         }}>
                           <button 
-                            onClick={() => setSelectedVolume(volume)}
+                            onClick={() => openVolume(volume)}
                             style={{
                               fontFamily: 'Georgia, serif',
                               padding: '0.5rem 1.5rem',
@@ -579,7 +590,7 @@ const Volumes = () => {
                         }}
                       >
                         <source 
-                          src={volume.audio_file.startsWith('http') ? volume.audio_file : `http://localhost:8000${volume.audio_file}`}
+                          src={volume.audio_stream_url || (volume.audio_file.startsWith('http') ? volume.audio_file : `http://localhost:8000${volume.audio_file}`)}
                           type="audio/mpeg" 
                         />
                       </audio>
@@ -1,6 +1,6 @@
 import axios from 'axios';
 
-const API_BASE_URL = import.meta.env.VITE_API_URL || (import.meta.env.PROD ? 'https://abbaswhispers.com/api' : 'http://localhost:8000/api');
+export const API_BASE_URL = import.meta.env.VITE_API_URL || (import.meta.env.PROD ? 'https://abbaswhispers.com/api' : 'http://localhost:8000/api');
 
 // Debug logging for deployment
 console.log('API_BASE_URL:', API_BASE_URL);
@@ -58,9 +58,15 @@ api.interceptors.response.use(
 );
 
 // API functions - Updated for Django REST Framework
+export const homeAPI = {
+  // First page of blog posts, volumes, testimonials and prayer testimonials in one request
+  getHome: () => api.get('/home/'),
+};
+
 export const blogAPI = {
   getAllPosts: (params) => api.get('/blog/', { params }),
   getPost: (id) => api.get(`/blog/${id}/`),
+  trackView: (id) => api.post(`/blog/${id}/view/`),
   createPost: (data) => api.post('/blog/', data),
   updatePost: (id, data) => api.put(`/blog/${id}/`, data),
   deletePost: (id) => api.delete(`/blog/${id}/`),